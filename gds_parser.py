@@ -91,6 +91,9 @@ _RE_STATUS      = re.compile(r"\b(HK|DK|NN|SS|RR|HN|HL|TK|UN|NO|UC|WK|WL)\d{{1,2
 _RE_BKG_CLASS   = re.compile(
     rf"\b([A-Z]{{2}}\s*\d{{1,4}})\s+([A-Z])\s+\d{{1,2}}(?:{_MON})", re.I
 )
+# Day glued to a month ("18APR"): every is_gds() score >= 4 without a status
+# code needs one, so its absence rules GDS out before the full pattern set runs.
+_RE_GDS_PRESCREEN = re.compile(rf"\d(?:{_MON})")
 
 # ── Amadeus / Sabre classic line ──────────────────────────────────────────────
 # EY 156 E 18APR 6*PRGAUH DK1 1120 1905 18APR E 0 789 M SEE RTSVC
@@ -269,7 +272,7 @@ def _build_segment(
          timezone offsets from AIRPORT_TZ_MAP to detect midnight crossing.
 
     Duration computed by DurationCalculator.calculate() which applies
-    UTC offsets from AIRPORT_TZ_MAP via TimezoneHandler.get_offset_hours().
+    UTC offsets from AIRPORT_TZ_MAP via TimezoneHandler.get_offset_minutes().
     This is the same function called on the LLM path.
     """
     dep_ap = dep_ap.upper()
@@ -485,6 +488,8 @@ class GDSParser:
         Returns True when score >= 4.
         """
         up = text.upper()
+        if not _RE_GDS_PRESCREEN.search(up) and not _RE_STATUS.search(up):
+            return False
         score = 0
         if _RE_GDS_TIME.search(up):         score += 2
         if _RE_GDS_DATE.search(up):         score += 2
@@ -492,7 +497,8 @@ class GDSParser:
         if _RE_AMADEUS.search(up):          score += 4
         if _RE_SLASH.search(up):            score += 4
         if _RE_BKG_CLASS.search(up):        score += 2
-        Logger.debug(f"GDS detection score: {score}")
+        if Logger.DEBUG:
+            Logger.debug(f"GDS detection score: {score}")
         return score >= 4
 
     def parse(self, text: str) -> List[Dict]:
@@ -511,7 +517,8 @@ class GDSParser:
         ref_year   = datetime.now().year
         sections   = self._split(text)
 
-        Logger.debug(f"GDS sections: {len(sections)}, trip: {ttype}")
+        if Logger.DEBUG:
+            Logger.debug(f"GDS sections: {len(sections)}, trip: {ttype}")
 
         from query_parser import DurationCalculator
         flights: List[Dict] = []
@@ -622,7 +629,8 @@ class GDSParser:
                 arr_date=arr_date,
             )
             segs.append(seg)
-            Logger.debug(f"Amadeus: {seg['flight_number']} {da}→{aa}")
+            if Logger.DEBUG:
+                Logger.debug(f"Amadeus: {seg['flight_number']} {da}→{aa}")
         return segs
 
     def _parse_slash(self, text: str, ref_year: int) -> List[Dict]:
@@ -641,7 +649,8 @@ class GDSParser:
                 _nd_from_marker(g.get("next_day")),
             )
             segs.append(seg)
-            Logger.debug(f"Slash: {seg['flight_number']} {da}→{aa}")
+            if Logger.DEBUG:
+                Logger.debug(f"Slash: {seg['flight_number']} {da}→{aa}")
         return segs
 
     def _parse_galileo(self, text: str, ref_year: int) -> List[Dict]:
@@ -672,7 +681,8 @@ class GDSParser:
                 arr_date=arr_date,
             )
             segs.append(seg)
-            Logger.debug(f"Galileo: {seg['flight_number']} {da}→{aa}")
+            if Logger.DEBUG:
+                Logger.debug(f"Galileo: {seg['flight_number']} {da}→{aa}")
         return segs
 
     def _parse_generic(self, text: str, ref_year: int) -> List[Dict]:
@@ -692,7 +702,8 @@ class GDSParser:
                 _nd_from_marker(g.get("next_day")),
             )
             segs.append(seg)
-            Logger.debug(f"Generic: {seg['flight_number']} {da}→{aa}")
+            if Logger.DEBUG:
+                Logger.debug(f"Generic: {seg['flight_number']} {da}→{aa}")
         return segs
 
     # ── Ancillary extractors ──────────────────────────────────────────────────
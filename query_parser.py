@@ -1,32 +1,87 @@
+import copy
+import hashlib
 import json
+import threading
+import time
 import uuid
 import os
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from types import SimpleNamespace
 from dotenv import load_dotenv
 
-load_dotenv()
-
 # ==================== CONFIG ====================
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+# Environment snapshot taken once per process; a module reload keeps the
+# existing snapshot instead of re-reading .env from disk.
+if '_QP_CONFIG' not in globals():
+    load_dotenv()
+    _QP_CONFIG = SimpleNamespace(
+        api_key=os.getenv("OPENROUTER_API_KEY"),
+        url=os.getenv("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions"),
+        model=os.getenv("MODEL", "openai/gpt-4o-mini"),
+        max_tokens=400,
+        # Completion ceiling of the model; packed bulk requests never ask for more
+        max_output_tokens=int(os.getenv("MAX_OUTPUT_TOKENS", "16384")),
+        temperature=0,
+        debug=os.getenv("LOG_LEVEL", "INFO") == "DEBUG",
+    )
 
-if not OPENROUTER_API_KEY:
+if not _QP_CONFIG.api_key:
     raise ValueError("OPENROUTER_API_KEY is not set in the environment")
-OPENROUTER_URL = os.getenv("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
-MODEL = os.getenv("MODEL", "openai/gpt-4o-mini")
-MAX_TOKENS = 400
-TEMPERATURE = 0
+OPENROUTER_API_KEY = _QP_CONFIG.api_key
+OPENROUTER_URL = _QP_CONFIG.url
+MODEL = _QP_CONFIG.model
+MAX_TOKENS = _QP_CONFIG.max_tokens
+TEMPERATURE = _QP_CONFIG.temperature
+
+# Shared keep-alive session so repeated OpenRouter calls reuse the TCP/TLS connection
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "Authorization": f"Bearer {_QP_CONFIG.api_key}",
+    "Content-Type": "application/json",
+})
+# Pool sized for extract_flights_batch workers. Only 429/5xx replies are
+# retried: a read timeout or dropped connection may mean the completion already
+# ran, and re-POSTing it would bill the prompt again and triple the latency.
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    max_retries=Retry(
+        total=2,
+        connect=0,
+        read=0,
+        other=0,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    ),
+))
 
 # ==================== IMPORTS ====================
 from mappings import AIRPORT_CODES, AIRLINE_CODES, AIRPORT_TZ_MAP
 import pytz
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only need
+# to catch the stdlib exception whichever parser is active.
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 # ==================== LOGGING ====================
 class Logger:
     """Centralized logging with levels"""
-    DEBUG = os.getenv("LOG_LEVEL", "INFO") == "DEBUG"
+    DEBUG = _QP_CONFIG.debug
 
     @staticmethod
     def debug(msg: str):
@@ -46,7 +101,33 @@ class Logger:
         print(f"[WARNING] {msg}")
 
 
+# DEBUG is fixed at import (see _QP_CONFIG), so drop the per-call check when it is off
+if not Logger.DEBUG:
+    Logger.debug = staticmethod(lambda msg: None)
+
+
 # ==================== DATE HANDLER ====================
+@lru_cache(maxsize=1)
+def _now_for_minute(minute_bucket: int) -> datetime:
+    return datetime.now()
+
+
+def _now() -> datetime:
+    """datetime.now(), refreshed at most once a minute; for date-level decisions only."""
+    return _now_for_minute(int(time.time()) // 60)
+
+
+def _date_shape(date_str: str) -> Optional[Tuple[str, bool]]:
+    """
+    (separator, starts with a letter) for a cleaned date string, or None when
+    it mixes '-', '/' and '.' and so cannot match any single format.
+    """
+    seps = [c for c in '-/.' if c in date_str]
+    if len(seps) > 1:
+        return None
+    return (seps[0] if seps else ' ', date_str[:1].isalpha())
+
+
 class FlightDate:
     """Centralized date parsing and formatting"""
 
@@ -67,6 +148,15 @@ class FlightDate:
         "%d %B", "%B %d",
     ]
 
+    # Formats grouped by _date_shape, in their original order. No directive
+    # matches '-', '/' or '.', and %b/%B must start with a letter, so a format
+    # outside a string's shape can never parse it.
+    _FORMATS_BY_SHAPE: Dict[Tuple[str, bool], Tuple[List[str], List[str]]] = {}
+    for _fmt in FORMATS_WITH_YEAR + FORMATS_WITHOUT_YEAR:
+        _shape = _date_shape(_fmt.replace('%b', 'b').replace('%B', 'B').replace('%', '0'))
+        _FORMATS_BY_SHAPE.setdefault(_shape, ([], []))[_fmt in FORMATS_WITHOUT_YEAR].append(_fmt)
+    del _fmt, _shape
+
     # ─── Comprehensive date regex ───────────────────────────────────────────
     # Handles all common human-readable date patterns:
     #
@@ -105,6 +195,10 @@ class FlightDate:
         # Numeric DD/MM/YYYY or DD.MM.YYYY (day first, most common in India)
         rf'\b(?P<day>{_DAY})[/.](?P<month_num>0[1-9]|1[0-2])[/.](?P<year>{_YEAR})(?!\d)\b',
     ]
+    _DATE_PATS = tuple(re.compile(p, re.IGNORECASE) for p in _DATE_PATTERNS)
+    # Every date pattern needs an ASCII day digit, so text without one has no dates
+    _ASCII_DIGIT_PAT = re.compile(r'[0-9]')
+    _MAX_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
 
     _MONTH_MAP = {
         'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4,  'may': 5,  'jun': 6,
@@ -119,14 +213,19 @@ class FlightDate:
         7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec',
     }
 
+    # Leading weekday name, or an ordinal suffix (group 1 keeps the digits)
+    _WEEKDAY_ORDINAL_PAT = re.compile(r'^[A-Za-z]{3,9},?\s*|(\d+)(?i:st|nd|rd|th)\b')
+    _ORDINAL_SUFFIX_PAT  = re.compile(r'(st|nd|rd|th)$', re.IGNORECASE)
+    _DAY_MONTH_PAT       = re.compile(r'(\d{1,2})\s*([a-z]+)')
+
     @staticmethod
+    @lru_cache(maxsize=1024)
     def clean_date_string(date_str: str) -> str:
         if not date_str or date_str in ['N/A', 'None', '']:
             return ''
         # Strip leading weekday name (e.g. "Monday, 30 Jan 26" → "30 Jan 26")
-        date_str = re.sub(r'^[A-Za-z]{3,9},?\s*', '', date_str)
-        # Remove ordinal suffixes
-        date_str = re.sub(r'(\d+)(st|nd|rd|th)\b', r'\1', date_str, flags=re.IGNORECASE)
+        # and ordinal suffixes ("30th" → "30") in one pass
+        date_str = FlightDate._WEEKDAY_ORDINAL_PAT.sub(lambda m: m[1] or '', date_str)
         return date_str.strip()
 
     @staticmethod
@@ -140,7 +239,7 @@ class FlightDate:
         # Logic for current year with 365-day rollover
         # (Flights are never more than 361-365 days in the future,
         # so if the date is > some margin in the past, it must be next year).
-        today = datetime.now()
+        today = _now()
 
         def _resolve_year(dt: datetime) -> datetime:
             if default_year:
@@ -151,24 +250,35 @@ class FlightDate:
                 return dt.replace(year=today.year + 1)
             return dt.replace(year=today.year)
 
-        for fmt in FlightDate.FORMATS_WITH_YEAR:
+        matched = FlightDate._match_format(date_str)
+        if matched is None:
+            Logger.warning(f"Could not parse date: '{date_str}'")
+            return None
+        dt, has_year = matched
+        return dt if has_year else _resolve_year(dt)
+
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _match_format(date_str: str) -> Optional[Tuple[datetime, bool]]:
+        """strptime against the formats for date_str's shape -> (datetime, has_year)."""
+        with_year, without_year = FlightDate._FORMATS_BY_SHAPE.get(
+            _date_shape(date_str), ((), ())
+        )
+        for fmt in with_year:
             try:
                 dt = datetime.strptime(date_str, fmt)
                 # If parsed year is very small (like 00 or 01 from missing year), it was fmt mismatch
                 if dt.year < 1900:
                     continue
-                return dt
+                return dt, True
             except ValueError:
                 continue
 
-        for fmt in FlightDate.FORMATS_WITHOUT_YEAR:
+        for fmt in without_year:
             try:
-                dt = datetime.strptime(date_str, fmt)
-                return _resolve_year(dt)
+                return datetime.strptime(date_str, fmt), False
             except ValueError:
                 continue
-
-        Logger.warning(f"Could not parse date: '{date_str}'")
         return None
 
     @staticmethod
@@ -177,36 +287,60 @@ class FlightDate:
             return 'N/A'
         return dt.strftime("%d %b %y")
 
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _lowered_text(text: str) -> str:
+        """text.lower(), shared by every flight validated against the same input."""
+        return text.lower()
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _flex_date_pat(clean_date: str) -> Optional[re.Pattern]:
+        """clean_date with any whitespace between its tokens, not preceded by a digit."""
+        parts = clean_date.split()
+        if not parts:
+            return None
+        return re.compile(r'(?<!\d)' + r'\s*'.join(map(re.escape, parts)))
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _day_month_pats(day: str, mon: str) -> Tuple[re.Pattern, re.Pattern, re.Pattern]:
+        """Day-month, month-day and GDS-glued "30JAN26" patterns for is_in_text."""
+        return (
+            re.compile(rf'\b{day}\s*{mon}[a-z]*', re.IGNORECASE),
+            re.compile(rf'\b{mon}[a-z]*\s+{day}\b', re.IGNORECASE),
+            re.compile(rf'\b{day}{mon}[a-z]*\d*\b', re.IGNORECASE),
+        )
+
     @staticmethod
     def is_in_text(date_str: str, text: str) -> bool:
         """
-        Strictly verify a date string actually appears in the original text.
-        Uses multiple matching strategies including reversed month-day order.
+        Strictly verify a date string actually appears in the original text:
+        a direct substring, then a whitespace-flexible match that cannot start
+        inside a number, then day+month in either order or GDS-glued form.
+        The regexes are compiled once per date / (day, month) and cached.
         """
         if not date_str or date_str == 'N/A':
             return False
         clean_date = FlightDate.clean_date_string(date_str).lower()
-        clean_text = text.lower()
+        clean_text = FlightDate._lowered_text(text)
 
         # Strategy 1: direct substring
         if clean_date in clean_text:
             return True
 
-        # Strategy 2: flexible whitespace
-        flex_pattern = re.sub(r'\s+', r'\\s*', re.escape(clean_date))
-        if re.search(flex_pattern, clean_text):
+        # Strategy 2: flexible whitespace ("30 jan" vs "30jan" / "30  jan").
+        # Digit-bounded so "15 feb" is not found inside "2341 5 feb".
+        flex_pat = FlightDate._flex_date_pat(clean_date)
+        if flex_pat is not None and flex_pat.search(clean_text):
             return True
 
         # Strategy 3: check day+month match (ignore year) — fwd and reversed order
-        day_month = re.match(r'(\d{1,2})\s*([a-z]+)', clean_date)
+        day_month = FlightDate._DAY_MONTH_PAT.match(clean_date)
         if day_month:
-            day, mon = day_month.group(1), day_month.group(2)[:3]
-            if re.search(rf'\b{day}\s*{mon}[a-z]*', clean_text, re.IGNORECASE):
-                return True
-            if re.search(rf'\b{mon}[a-z]*\s+{day}\b', clean_text, re.IGNORECASE):
-                return True
-            # Strategy 4: GDS glued format "30JAN26"
-            if re.search(rf'\b{day}{mon}[a-z]*\d*\b', clean_text, re.IGNORECASE):
+            # Strategy 4 (last pattern): GDS glued format "30JAN26"
+            pats = FlightDate._day_month_pats(day_month.group(1), day_month.group(2)[:3])
+            if any(pat.search(clean_text) for pat in pats):
                 return True
 
         return False
@@ -225,7 +359,7 @@ class FlightDate:
             year_raw = gd.get('year', '')
 
             # Day
-            day_clean = re.sub(r'(st|nd|rd|th)$', '', day_raw, flags=re.IGNORECASE)
+            day_clean = FlightDate._ORDINAL_SUFFIX_PAT.sub('', day_raw)
             day = int(day_clean)
             if not (1 <= day <= 31):
                 return None
@@ -262,15 +396,13 @@ class FlightDate:
         Returns a deduplicated list of normalized strings like
         ['30 Jan 26', '05 Feb'] in document order.
         """
+        if not FlightDate._ASCII_DIGIT_PAT.search(text):
+            return []
+
         seen_spans: List[Tuple[int, int]] = []  # track character spans to avoid overlaps
         results: List[Tuple[int, str]] = []      # (start_pos, formatted_date)
 
-        for pat_str in FlightDate._DATE_PATTERNS:
-            try:
-                pat = re.compile(pat_str, re.IGNORECASE)
-            except re.error:
-                continue
-
+        for pat in FlightDate._DATE_PATS:
             for m in pat.finditer(text):
                 start, end = m.span()
 
@@ -289,8 +421,7 @@ class FlightDate:
                 day, mon_num, yr = resolved
 
                 # Basic calendar validity
-                max_days_in_month = [0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-                if not (1 <= mon_num <= 12) or day > max_days_in_month[mon_num]:
+                if not (1 <= mon_num <= 12) or day > FlightDate._MAX_DAYS_IN_MONTH[mon_num]:
                     continue
 
                 mon_abbr = FlightDate._MONTH_ABBR_MAP[mon_num]
@@ -369,12 +500,15 @@ class AirportValidator:
             errors.append(f"Unknown arrival airport code: '{arr}'")
 
         # Top-level dep != arr
-        if dep and arr and dep != 'N/A' and arr != 'N/A':
+        if dep == arr and dep and dep != 'N/A':
             if AirportValidator.check_same_airport(dep, arr, 'top-level'):
                 errors.append(f"Departure and arrival airports are the same: {dep}")
 
-        # Segment-level checks
+        # Segment-level checks, one pass. Layover errors are kept separate so
+        # they still follow every route error.
         segments = flight.get('segments', []) or []
+        layover_errors: List[str] = []
+        prev_arr = ''
         for i, seg in enumerate(segments):
             s_dep = AirportValidator.normalize(seg.get('departure_airport', ''))
             s_arr = AirportValidator.normalize(seg.get('arrival_airport', ''))
@@ -384,7 +518,7 @@ class AirportValidator:
             if s_arr and s_arr != 'N/A' and not AirportValidator.is_valid(s_arr):
                 errors.append(f"Segment {i+1}: unknown arrival airport '{s_arr}'")
 
-            if s_dep and s_arr and s_dep != 'N/A' and s_arr != 'N/A':
+            if s_dep == s_arr and s_dep and s_dep != 'N/A':
                 if AirportValidator.check_same_airport(s_dep, s_arr, f'segment {i+1}'):
                     errors.append(
                         f"Segment {i+1}: departure and arrival airports are the same: {s_dep}"
@@ -392,32 +526,28 @@ class AirportValidator:
 
             # Connecting segments: prev arrival must equal this departure
             if i > 0:
-                prev_arr = AirportValidator.normalize(
-                    segments[i-1].get('arrival_airport', '')
-                )
                 if prev_arr and s_dep and prev_arr != 'N/A' and s_dep != 'N/A':
                     if prev_arr != s_dep:
                         errors.append(
                             f"Segment {i+1}: departure airport ({s_dep}) does not match "
                             f"segment {i} arrival airport ({prev_arr}) — gap in route"
                         )
+            prev_arr = s_arr
 
-        # Layover airport must differ from both dep and arr of the same segment
-        for i, seg in enumerate(segments):
-            s_dep = AirportValidator.normalize(seg.get('departure_airport', ''))
-            s_arr = AirportValidator.normalize(seg.get('arrival_airport', ''))
+            # Layover airport must differ from both dep and arr of the same segment
             layover_ap = AirportValidator.normalize(seg.get('layover_city', ''))
             # layover_city may be a city name; skip if it doesn't look like an airport code
             if len(layover_ap) == 3 and AirportValidator.is_valid(layover_ap):
                 if layover_ap == s_dep:
-                    errors.append(
+                    layover_errors.append(
                         f"Segment {i+1}: layover airport ({layover_ap}) same as departure"
                     )
                 if layover_ap == s_arr:
-                    errors.append(
+                    layover_errors.append(
                         f"Segment {i+1}: layover airport ({layover_ap}) same as arrival"
                     )
 
+        errors.extend(layover_errors)
         return errors
 
 
@@ -427,43 +557,91 @@ class TimezoneHandler:
 
     @staticmethod
     def get_offset_hours(airport_code: str, date_obj: Optional[datetime] = None) -> Optional[float]:
+        minutes = TimezoneHandler.get_offset_minutes(airport_code, date_obj)
+        return None if minutes is None else minutes / 60
+
+    @staticmethod
+    def get_offset_minutes(airport_code: str, date_obj: Optional[datetime] = None) -> Optional[int]:
+        """UTC offset in whole minutes, so duration maths stays in integers."""
         if not airport_code:
             return None
-        tz_name = AIRPORT_TZ_MAP.get(airport_code.upper())
+        code = airport_code.upper()
+        tz_name = AIRPORT_TZ_MAP.get(code)
         if not tz_name:
-            Logger.debug(f"Missing timezone for '{airport_code}' in AIRPORT_TZ_MAP. Returning None (naive calculation).")
+            if Logger.DEBUG:
+                Logger.debug(f"Missing timezone for '{airport_code}' in AIRPORT_TZ_MAP. Returning None (naive calculation).")
             return None
         try:
-            tz = pytz.timezone(tz_name)
-            dt = date_obj or datetime.now()
+            dt = date_obj or _now()
             if dt.tzinfo is None:
-                # Use midday to avoid DST edge cases when only a date is known.
-                dt = dt.replace(hour=12, minute=0, second=0, microsecond=0)
-                dt = tz.localize(dt, is_dst=None)
-            else:
-                dt = dt.astimezone(tz)
-            offset_seconds = dt.utcoffset().total_seconds()
-            return offset_seconds / 3600.0
+                # Naive dates are evaluated at midday, so only the calendar day matters
+                return TimezoneHandler._offset_cached(code, dt.toordinal())
+            return dt.astimezone(pytz.timezone(tz_name)).utcoffset() // timedelta(minutes=1)
         except Exception as e:
             Logger.error(f"Error getting timezone for {airport_code}: {e}")
-            return 0.0
+            return 0
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _offset_cached(code: str, ordinal: int) -> int:
+        tz = pytz.timezone(AIRPORT_TZ_MAP[code])
+        # Use midday to avoid DST edge cases when only a date is known.
+        dt = tz.localize(datetime.fromordinal(ordinal).replace(hour=12), is_dst=None)
+        return dt.utcoffset() // timedelta(minutes=1)
 
 
 # ==================== DURATION CALCULATOR ====================
 class DurationCalculator:
     """Centralized duration calculation with timezone and day offset support"""
 
+    # Same sub-patterns strptime uses for "%H:%M" and "%I:%M %p" / "%I:%M%p",
+    # so one match replaces the per-format try/except probing.
+    _TIME_PAT = re.compile(
+        r'(2[0-3]|[0-1]\d|\d):([0-5]\d|\d)'
+        r'|(1[0-2]|0[1-9]|[1-9]):([0-5]\d|\d)\s*([AP])M',
+        re.IGNORECASE
+    )
+    _DURATION_TEXT_PATS = tuple(re.compile(p, re.IGNORECASE) for p in (
+        r'(\d+)h\s*(\d+)?m?',
+        r'(\d+):(\d+)\s*(?:hrs?|hours?)?',
+        r'(\d+)\s*hrs?\s*(\d+)\s*min',
+        r'(\d+)\s*hours?\s*(\d+)\s*minutes?',
+    ))
+
     @staticmethod
     def parse_time(time_str: str) -> Optional[datetime]:
-        if not time_str or time_str == 'N/A':
+        hm = DurationCalculator.parse_hm(time_str)
+        if hm is None:
             return None
-        time_str = time_str.strip()
-        for fmt in ["%H:%M", "%I:%M %p", "%I:%M%p"]:
-            try:
-                return datetime.strptime(time_str, fmt)
-            except ValueError:
-                continue
-        return None
+        return datetime(1900, 1, 1, *hm)
+
+    @staticmethod
+    def parse_hm(time_str: str) -> Optional[Tuple[int, int]]:
+        """Like parse_time(), but returns (hour, minute) without building a datetime."""
+        # Never raises: non-string input (e.g. a JSON number from the LLM) is unknown
+        if not isinstance(time_str, str) or not time_str or time_str == 'N/A':
+            return None
+        return DurationCalculator._parse_hm_cached(time_str)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parse_hm_cached(time_str: str) -> Optional[Tuple[int, int]]:
+        m = DurationCalculator._TIME_PAT.fullmatch(time_str.strip())
+        if not m:
+            return None
+        if m.group(1) is not None:
+            return int(m.group(1)), int(m.group(2))
+        return int(m.group(3)) % 12 + (12 if m.group(5) in 'Pp' else 0), int(m.group(4))
+
+    @staticmethod
+    def _minutes_between(start: Tuple[int, int], end: Tuple[int, int], days: int) -> int:
+        """Clock minutes from start to end, `days` later or else the next day when end < start."""
+        minutes = (end[0] - start[0]) * 60 + (end[1] - start[1])
+        if days > 0:
+            return minutes + days * 24 * 60
+        if minutes < 0:
+            return minutes + 24 * 60
+        return minutes
 
     @staticmethod
     def calculate(
@@ -475,38 +653,98 @@ class DurationCalculator:
         flight_date: Optional[datetime] = None,
         check_ultra_long: bool = True
     ) -> str:
+        return DurationCalculator.format_parts(DurationCalculator.calculate_parts(
+            dep_time, arr_time, dep_airport, arr_airport,
+            days_offset, flight_date, check_ultra_long
+        ))
+
+    @staticmethod
+    def calculate_parts(
+        dep_time: str,
+        arr_time: str,
+        dep_airport: Optional[str] = None,
+        arr_airport: Optional[str] = None,
+        days_offset: int = 0,
+        flight_date: Optional[datetime] = None,
+        check_ultra_long: bool = True
+    ) -> Optional[Tuple[int, int]]:
+        """Like calculate(), but returns (hours, minutes), or None when unknown."""
+        # Timezone offsets only depend on the calendar day of a naive flight_date,
+        # so key the cache on its ordinal. Aware datetimes skip the cache.
+        try:
+            if flight_date is not None and flight_date.tzinfo is not None:
+                return DurationCalculator._calculate(
+                    dep_time, arr_time, dep_airport, arr_airport,
+                    days_offset, flight_date, check_ultra_long
+                )
+            flight_ordinal = (flight_date or _now()).toordinal()
+            return DurationCalculator._calculate_cached(
+                dep_time, arr_time, dep_airport, arr_airport,
+                days_offset, flight_ordinal, check_ultra_long
+            )
+        except Exception as e:
+            # Non-datetime flight_date or unhashable arguments
+            Logger.error(f"Duration calculation failed ({dep_airport}->{arr_airport}): {e}")
+            return None
+
+    @staticmethod
+    def format_parts(parts: Optional[Tuple[int, int]]) -> str:
+        if parts is None:
+            return "N/A"
+        return f"{parts[0]}h {parts[1]}m"
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _calculate_cached(
+        dep_time: str,
+        arr_time: str,
+        dep_airport: Optional[str],
+        arr_airport: Optional[str],
+        days_offset: int,
+        flight_ordinal: int,
+        check_ultra_long: bool
+    ) -> Optional[Tuple[int, int]]:
+        return DurationCalculator._calculate(
+            dep_time, arr_time, dep_airport, arr_airport,
+            days_offset, datetime.fromordinal(flight_ordinal), check_ultra_long
+        )
+
+    @staticmethod
+    def _calculate(
+        dep_time: str,
+        arr_time: str,
+        dep_airport: Optional[str],
+        arr_airport: Optional[str],
+        days_offset: int,
+        flight_date: Optional[datetime],
+        check_ultra_long: bool
+    ) -> Optional[Tuple[int, int]]:
         try:
-            dep = DurationCalculator.parse_time(dep_time)
-            arr = DurationCalculator.parse_time(arr_time)
+            dep = DurationCalculator.parse_hm(dep_time)
+            arr = DurationCalculator.parse_hm(arr_time)
             if not dep or not arr:
-                return "N/A"
-            if days_offset > 0:
-                arr = arr + timedelta(days=days_offset)
-            elif arr < dep:
-                arr = arr + timedelta(days=1)
-            dep_tz = TimezoneHandler.get_offset_hours(dep_airport, flight_date)
-            arr_tz = TimezoneHandler.get_offset_hours(arr_airport, flight_date)
-            diff = arr - dep
-            apparent_minutes = int(diff.total_seconds() / 60)
+                return None
+            apparent_minutes = DurationCalculator._minutes_between(dep, arr, days_offset)
+            dep_tz = TimezoneHandler.get_offset_minutes(dep_airport, flight_date)
+            arr_tz = TimezoneHandler.get_offset_minutes(arr_airport, flight_date)
             if dep_tz is None or arr_tz is None:
                 tz_diff_minutes = 0
             else:
-                tz_diff_minutes = int((arr_tz - dep_tz) * 60)
+                tz_diff_minutes = arr_tz - dep_tz
             actual_minutes = apparent_minutes - tz_diff_minutes
             if check_ultra_long and actual_minutes > 24 * 60:
                 alt_minutes = actual_minutes - 24 * 60
                 if 0 < alt_minutes < 24 * 60:
-                    Logger.debug(f"Ultra-long duration detected ({actual_minutes/60:.1f}h). "
-                                 f"Correcting to {alt_minutes/60:.1f}h")
+                    if Logger.DEBUG:
+                        Logger.debug(f"Ultra-long duration detected ({actual_minutes/60:.1f}h). "
+                                     f"Correcting to {alt_minutes/60:.1f}h")
                     actual_minutes = alt_minutes
             if actual_minutes < 0:
                 actual_minutes += 24 * 60
-            hours = actual_minutes // 60
-            minutes = actual_minutes % 60
-            return f"{hours}h {minutes}m"
+            return actual_minutes // 60, actual_minutes % 60
         except Exception as e:
             Logger.error(f"Duration calculation failed ({dep_airport}->{arr_airport}): {e}")
-            return "N/A"
+            return None
 
     @staticmethod
     def calculate_layover(
@@ -517,16 +755,11 @@ class DurationCalculator:
         date_obj: Optional[datetime] = None
     ) -> str:
         try:
-            arr = DurationCalculator.parse_time(prev_arr_time)
-            dep = DurationCalculator.parse_time(next_dep_time)
+            arr = DurationCalculator.parse_hm(prev_arr_time)
+            dep = DurationCalculator.parse_hm(next_dep_time)
             if not arr or not dep:
                 return "N/A"
-            if days_between > 0:
-                dep = dep + timedelta(days=days_between)
-            elif dep < arr:
-                dep = dep + timedelta(days=1)
-            diff = dep - arr
-            total_minutes = int(diff.total_seconds() / 60)
+            total_minutes = DurationCalculator._minutes_between(arr, dep, days_between)
             if total_minutes < 0:
                 total_minutes += 24 * 60
             hours = total_minutes // 60
@@ -537,15 +770,10 @@ class DurationCalculator:
             return "N/A"
 
     @staticmethod
+    @lru_cache(maxsize=512)
     def parse_duration_text(text: str) -> Optional[str]:
-        patterns = [
-            r'(\d+)h\s*(\d+)?m?',
-            r'(\d+):(\d+)\s*(?:hrs?|hours?)?',
-            r'(\d+)\s*hrs?\s*(\d+)\s*min',
-            r'(\d+)\s*hours?\s*(\d+)\s*minutes?'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in DurationCalculator._DURATION_TEXT_PATS:
+            match = pattern.search(text)
             if match:
                 hours = int(match.group(1))
                 minutes = int(match.group(2)) if match.group(2) else 0
@@ -557,6 +785,8 @@ class DurationCalculator:
 class DayOffsetCalculator:
     """Calculate how many days between departure and arrival"""
 
+    _DURATION_PAT = re.compile(r'(\d+)h\s*(\d+)?m?')
+
     @staticmethod
     def calculate(
         dep_time: str,
@@ -564,32 +794,37 @@ class DayOffsetCalculator:
         duration_str: Optional[str] = None,
         dep_airport: Optional[str] = None,
         arr_airport: Optional[str] = None,
-        flight_date: Optional[datetime] = None
+        flight_date: Optional[datetime] = None,
+        duration_parts: Optional[Tuple[int, int]] = None
     ) -> int:
+        """
+        duration_parts, when given, is the (hours, minutes) pair behind
+        duration_str and saves re-parsing the string.
+        """
         try:
-            dep = DurationCalculator.parse_time(dep_time)
-            arr = DurationCalculator.parse_time(arr_time)
+            dep = DurationCalculator.parse_hm(dep_time)
+            arr = DurationCalculator.parse_hm(arr_time)
             if not dep or not arr:
                 return 0
-            dep_tz = TimezoneHandler.get_offset_hours(dep_airport, flight_date)
-            arr_tz = TimezoneHandler.get_offset_hours(arr_airport, flight_date)
-            tz_diff_hours = (arr_tz - dep_tz) if dep_tz is not None and arr_tz is not None else 0
-            dep_hours = dep.hour + dep.minute / 60
-            arr_hours = arr.hour + arr.minute / 60
-            apparent_diff_hours = arr_hours - dep_hours
-            if duration_str and duration_str != 'N/A':
-                dur_match = re.match(r'(\d+)h\s*(\d+)?m?', duration_str)
+            dep_tz = TimezoneHandler.get_offset_minutes(dep_airport, flight_date)
+            arr_tz = TimezoneHandler.get_offset_minutes(arr_airport, flight_date)
+            tz_diff_minutes = (arr_tz - dep_tz) if dep_tz is not None and arr_tz is not None else 0
+            # Whole minutes: in float hours 07:50 + 12h10m + 4h sums to just
+            # under 24 and an arrival exactly on midnight loses its +1
+            dep_minutes = dep[0] * 60 + dep[1]
+            arr_minutes = arr[0] * 60 + arr[1]
+            if duration_parts is None and duration_str and duration_str != 'N/A':
+                dur_match = DayOffsetCalculator._DURATION_PAT.match(duration_str)
                 if dur_match:
-                    duration_hours = int(dur_match.group(1))
-                    if dur_match.group(2):
-                        duration_hours += int(dur_match.group(2)) / 60
-                    expected_apparent_gain = duration_hours + tz_diff_hours
-                    days_crossed = int((dep_hours + expected_apparent_gain) // 24)
-                    return max(0, days_crossed)
-            if apparent_diff_hours < -12:
+                    duration_parts = (
+                        int(dur_match.group(1)),
+                        int(dur_match.group(2)) if dur_match.group(2) else None
+                    )
+            if duration_parts is not None:
+                duration_minutes = duration_parts[0] * 60 + (duration_parts[1] or 0)
+                return max(0, (dep_minutes + duration_minutes + tz_diff_minutes) // 1440)
+            if arr_minutes - dep_minutes < -720:
                 return 1
-            elif apparent_diff_hours >= 12:
-                return 0
             return 0
         except Exception as e:
             Logger.error(f"Day offset calculation failed: {e}")
@@ -597,50 +832,135 @@ class DayOffsetCalculator:
 
 
 # ==================== TEXT PREPROCESSOR ====================
+def _fuse_substitutions(rules: List[Tuple[str, str]], flags: int = 0) -> Tuple[re.Pattern, Dict[int, str]]:
+    """
+    Fuse independent (pattern, template) substitutions into one alternation so
+    the text is scanned once instead of once per rule.
+
+    Returns the compiled pattern and a map from each rule's wrapping group index
+    to its template, with back-references renumbered for use with Match.expand.
+    """
+    parts: List[str] = []
+    templates: Dict[int, str] = {}
+    group = 1
+    for pattern, template in rules:
+        parts.append(f'({pattern})')
+        templates[group] = re.sub(
+            r'\\(\d)', lambda t: rf'\g<{int(t.group(1)) + group}>', template
+        )
+        group += re.compile(pattern).groups + 1
+    return re.compile('|'.join(parts), flags), templates
+
+
+def _trie_alternation(words) -> str:
+    """
+    Build a regex alternation for a fixed word list, factored by shared prefix
+    ("DEL|DXB" -> "D(?:EL|XB)") so re branches once per character instead of
+    trying every word in turn.
+    """
+    trie: Dict[str, Dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def _emit(node: Dict) -> str:
+        branches = [re.escape(ch) + _emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return _emit(trie)
+
+
+# "2 hrs 30 min" / "2 hours 30 minutes" → "2h 30m"
+_DURATION_RE, _DURATION_TEMPLATES = _fuse_substitutions([
+    (r'(\d+)\s*hrs?\s*(\d+)\s*min', r'\1h \2m'),
+    (r'(\d+)\s*hours?\s*(\d+)\s*minutes?', r'\1h \2m'),
+], re.IGNORECASE)
+
+# "2:30 hrs" → "2h 30m", "Rs." / "INR" → "₹". Must run after _DURATION_RE, which
+# needs to see "hrs" before the Rs rule rewrites it; "INRs" is left to the Rs rule.
+_DURATION_CURRENCY_RE, _DURATION_CURRENCY_TEMPLATES = _fuse_substitutions([
+    (r'(\d+):(\d+)\s*(hrs?|hours?)', r'\1h \2m'),
+    (r'Rs\.?\s*', '₹'),
+    (r'INR(?!s)\s*', '₹'),
+], re.IGNORECASE)
+
+
 class TextPreprocessor:
     """Clean and normalize input text"""
 
     CITY_ABBREVS = {
-        r'\bkol\b': 'Kolkata', r'\bcal\b': 'Kolkata',
-        r'\bdel\b': 'Delhi',
-        r'\bbom\b': 'Mumbai', r'\bmum\b': 'Mumbai',
-        r'\bblr\b': 'Bengaluru', r'\bban\b': 'Bengaluru',
-        r'\bmad\b': 'Chennai', r'\bche\b': 'Chennai',
-        r'\bhyd\b': 'Hyderabad',
-        r'\bsin\b': 'Singapore',
-        r'\bdxb\b': 'Dubai',
-        r'\bgoa\b': 'Goa',
-        r'\bpat\b': 'Patna',
-        r'\bgau\b': 'Guwahati'
+        'kol': 'Kolkata', 'cal': 'Kolkata',
+        'del': 'Delhi',
+        'bom': 'Mumbai', 'mum': 'Mumbai',
+        'blr': 'Bengaluru', 'ban': 'Bengaluru',
+        'mad': 'Chennai', 'che': 'Chennai',
+        'hyd': 'Hyderabad',
+        'sin': 'Singapore',
+        'dxb': 'Dubai',
+        'goa': 'Goa',
+        'pat': 'Patna',
+        'gau': 'Guwahati'
     }
 
+    # All CITY_ABBREVS in one alternation, expanded in a single scan
+    _CITY_ABBREV_PAT = re.compile(
+        r'\b(?:' + '|'.join(map(re.escape, CITY_ABBREVS)) + r')\b', re.IGNORECASE
+    )
+
+    _GLUED_MONTH_PAT = re.compile(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)([A-Z])')
+
+    _WHITESPACE_PAT      = re.compile(r'\s+')
+    _GLUED_FLIGHT_PAT    = re.compile(r'(\d{3})([A-Z]{2}\s*\d{1,4})')
+    _AMPM_WORD_PAT       = re.compile(r'(\d{1,2}[:\.]\d{2})\s*(AM|PM)([A-Z])', re.IGNORECASE)
+    _AMPM_LETTER_PAT     = re.compile(r'([AP]M)([a-zA-Z])', re.IGNORECASE)
+    _AMPM_OFFSET_PAT     = re.compile(r'([AP]M)\+(\d)', re.IGNORECASE)
+    _OFFSET_WORD_PAT     = re.compile(r'\+(\d)([A-Za-z])')
+    _TIME_OFFSET_PAT     = re.compile(r'(\d{2}:\d{2})\+(\d)')
+    _GLUED_LAYOVER_PAT   = re.compile(r'(layover)([A-Z])', re.IGNORECASE)
+    _TIME_WORD_PAT       = re.compile(r'(\d{2}:\d{2})([A-Z][a-z])')
+    _GLUED_WEEKDAY_PAT   = re.compile(r'([a-z])(Tues|Wed|Thurs|Fri|Sat|Sun)\b', re.IGNORECASE)
+    _EMISSIONS_PAT       = re.compile(r'emissions\s*estimate:?\s*\d[\d\s,]*kg\s*co2e', re.IGNORECASE)
+    _CO2E_PAT            = re.compile(r'\b\d[\d,]*\s*kg\s*co2e', re.IGNORECASE)
+    _DAY_CODE_PAT        = re.compile(r'\b(\d{1,2})([A-Z]{3})\b', re.IGNORECASE)
+    _GLUED_AIRPORTS_PAT  = re.compile(r'\b([A-Z]{3})([A-Z]{3})\b')
+    _GDS_TIMES_PAT       = re.compile(r'\s(\d{4})\s+(\d{4})(?=\s|$)')
+    _TOKEN3_PAT          = re.compile(r'\b[A-Z]{3}\b')
+
     @staticmethod
     def process(raw_text: str) -> str:
         text = raw_text.strip()
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'(\d+)\s*hrs?\s*(\d+)\s*min', r'\1h \2m', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+)\s*hours?\s*(\d+)\s*minutes?', r'\1h \2m', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+):(\d+)\s*(hrs?|hours?)', r'\1h \2m', text, flags=re.IGNORECASE)
-        text = re.sub(r'Rs\.?\s*', '₹', text, flags=re.IGNORECASE)
-        text = re.sub(r'INR\s*', '₹', text, flags=re.IGNORECASE)
-        for abbrev, full in TextPreprocessor.CITY_ABBREVS.items():
-            text = re.sub(abbrev, full, text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d{3})([A-Z]{2}\s*\d{1,4})', r'\1 \2', text)
-        text = re.sub(r'(\d{1,2}[:\.]\d{2})\s*(AM|PM)([A-Z])', r'\1 \2 \3', text, flags=re.IGNORECASE)
-        text = re.sub(r'([AP]M)([a-zA-Z])', r'\1 \2', text, flags=re.IGNORECASE)
-        text = re.sub(r'([AP]M)\+(\d)', r'\1 +\2 ', text, flags=re.IGNORECASE)
-        text = re.sub(r'\+(\d)([A-Za-z])', r'+\1 \2', text)
-        text = re.sub(r'(\d{2}:\d{2})\+(\d)', r'\1 +\2 ', text)
-        text = re.sub(r'(layover)([A-Z])', r'\1 \2', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d{2}:\d{2})([A-Z][a-z])', r'\1 \2', text)
-        text = re.sub(r'([a-z])(Tues|Wed|Thurs|Fri|Sat|Sun)\b', r'\1 \2', text, flags=re.IGNORECASE)
+        text = TextPreprocessor._WHITESPACE_PAT.sub(' ', text)
+        text = _DURATION_RE.sub(lambda m: m.expand(_DURATION_TEMPLATES[m.lastindex]), text)
+        text = _DURATION_CURRENCY_RE.sub(
+            lambda m: m.expand(_DURATION_CURRENCY_TEMPLATES[m.lastindex]), text
+        )
+        text = TextPreprocessor._CITY_ABBREV_PAT.sub(TextPreprocessor._expand_city_abbrev, text)
+        text = TextPreprocessor._GLUED_FLIGHT_PAT.sub(r'\1 \2', text)
+        text = TextPreprocessor._AMPM_WORD_PAT.sub(r'\1 \2 \3', text)
+        text = TextPreprocessor._AMPM_LETTER_PAT.sub(r'\1 \2', text)
+        # Rules keyed on a literal are skipped when it is absent (a C-level
+        # substring test instead of a full regex scan). No non-ASCII character
+        # case-folds onto 'layover' or 'co2e', so the lower() checks are exact.
+        if '+' in text:
+            text = TextPreprocessor._AMPM_OFFSET_PAT.sub(r'\1 +\2 ', text)
+            text = TextPreprocessor._OFFSET_WORD_PAT.sub(r'+\1 \2', text)
+            text = TextPreprocessor._TIME_OFFSET_PAT.sub(r'\1 +\2 ', text)
+        if 'layover' in text.lower():
+            text = TextPreprocessor._GLUED_LAYOVER_PAT.sub(r'\1 \2', text)
+        text = TextPreprocessor._TIME_WORD_PAT.sub(r'\1 \2', text)
+        text = TextPreprocessor._GLUED_WEEKDAY_PAT.sub(r'\1 \2', text)
         # Split glued month + word: "JunDubai" -> "Jun Dubai"
-        _MONTH_ABBR_REGEX = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)'
-        text = re.sub(rf'({_MONTH_ABBR_REGEX})([A-Z])', r'\1 \2', text)
+        text = TextPreprocessor._GLUED_MONTH_PAT.sub(r'\1 \2', text)
         
         # Strip CO2e values safely (line-aware, not greedy across lines)
-        text = re.sub(r'emissions\s*estimate:?\s*\d[\d\s,]*kg\s*co2e', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'\b\d[\d,]*\s*kg\s*co2e', '', text, flags=re.IGNORECASE)
+        if 'co2e' in text.lower():
+            text = TextPreprocessor._EMISSIONS_PAT.sub('', text)
+            text = TextPreprocessor._CO2E_PAT.sub('', text)
         # Split GDS-glued day+airport: "22AMS" → "22 AMS"
         # BUT do NOT split when the 3-letter token is a month abbreviation
         # (those are handled correctly by the date extractor already).
@@ -655,11 +975,22 @@ class TextPreprocessor:
             if code_part in AIRPORT_CODES:
                 return f"{day_part} {code_part}"
             return m.group(0)
-        text = re.sub(r'\b(\d{1,2})([A-Z]{3})\b', _split_day_code, text, flags=re.IGNORECASE)
+        text = TextPreprocessor._DAY_CODE_PAT.sub(_split_day_code, text)
         text = TextPreprocessor._split_gds_airports(text)
         text = TextPreprocessor._format_gds_times(text)
         return text
 
+    @staticmethod
+    def _expand_city_abbrev(m: re.Match) -> str:
+        token = m.group(0)
+        full = TextPreprocessor.CITY_ABBREVS.get(token.lower())
+        if full is None:
+            # Non-ASCII case variants (e.g. "ſin") that IGNORECASE also matches
+            for abbrev, name in TextPreprocessor.CITY_ABBREVS.items():
+                if re.fullmatch(re.escape(abbrev), token, flags=re.IGNORECASE):
+                    return name
+        return full
+
     @staticmethod
     def _split_gds_airports(text: str) -> str:
         def replacer(match):
@@ -669,13 +1000,15 @@ class TextPreprocessor:
             if c1 in AIRPORT_CODES and c2 in AIRPORT_CODES:
                 return f"{c1} {c2}"
             return full
-        return re.sub(r'\b([A-Z]{3})([A-Z]{3})\b', replacer, text)
+        return TextPreprocessor._GLUED_AIRPORTS_PAT.sub(replacer, text)
 
     @staticmethod
     def _format_gds_times(text: str) -> str:
         def replacer(match):
             prefix = text[max(0, match.start()-20):match.start()].upper()
-            has_context = any(code in prefix for code in list(AIRPORT_CODES.keys())[:50])
+            has_context = any(
+                tok in AIRPORT_CODES for tok in TextPreprocessor._TOKEN3_PAT.findall(prefix)
+            )
             if not has_context:
                 return match.group(0)
             t1 = match.group(1)
@@ -688,7 +1021,7 @@ class TextPreprocessor:
             except Exception:
                 pass
             return match.group(0)
-        return re.sub(r'\s(\d{4})\s+(\d{4})(?=\s|$)', replacer, text)
+        return TextPreprocessor._GDS_TIMES_PAT.sub(replacer, text)
 
 
 # ==================== REGEX HINT EXTRACTOR ====================
@@ -698,8 +1031,8 @@ class HintExtractor:
     @staticmethod
     def _normalize_lookup_key(value: str) -> str:
         # Replace non-alphanumeric chars with spaces, collapse spaces, and lowercase
-        clean = re.sub(r'[^a-z0-9]+', ' ', (value or "").lower())
-        return re.sub(r'\s+', ' ', clean).strip()
+        clean = HintExtractor._NON_ALNUM_PAT.sub(' ', (value or "").lower())
+        return HintExtractor._SPACES_PAT.sub(' ', clean).strip()
 
     @staticmethod
     def _is_ambiguous_city_alias(alias: str) -> bool:
@@ -849,7 +1182,14 @@ class HintExtractor:
             merged[alias] = code
         return merged
 
-    FALSE_POSITIVE_AIRPORTS = {
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _cities_longest_first() -> Tuple[Tuple[str, str], ...]:
+        """(city, IATA) pairs of the merged lookup, longest name first; built once."""
+        return tuple(sorted(HintExtractor._get_city_to_iata().items(),
+                            key=lambda x: -len(x[0])))
+
+    FALSE_POSITIVE_AIRPORTS = frozenset({
         'THE', 'AND', 'FOR', 'ALL', 'VIA', 'NON', 'ONE', 'TWO',
         'DAY', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC',
         'JAN', 'FEB', 'MAR', 'APR', 'SAT', 'SUN', 'MON', 'TUE', 'WED',
@@ -857,30 +1197,59 @@ class HintExtractor:
         'PPC', 'GDS', 'SEE', 'RTS', 'SVC', 'PNR',
         # Additional false positives from ordinal/time fragments
         'NOT', 'SET', 'GET', 'PUT', 'CAN', 'HAS', 'HAD', 'WAS', 'ARE',
-    }
+    })
+
+    # Known IATA codes minus FALSE_POSITIVE_AIRPORTS, so non-airport 3-letter
+    # tokens never reach Python
+    _AIRPORT_PAT = re.compile(r'\b(' + _trie_alternation(
+        code for code in AIRPORT_CODES.keys() - FALSE_POSITIVE_AIRPORTS
+        if re.fullmatch(r'[A-Z]{3}', code)
+    ) + r')\b')
+
+    _TIME_PAT = re.compile(r'(\d{1,2})[:\.](\d{2})\s*(am|pm)?', re.IGNORECASE)
+
+    _NON_ALNUM_PAT     = re.compile(r'[^a-z0-9]+')
+    _SPACES_PAT        = re.compile(r'\s+')
+    _FLIGHT_NUMBER_PAT = re.compile(r'\b([A-Z]{2}|[A-Z]\d|\d[A-Z])\s*[-]?[/\s]?\s*(\d{1,4})\b')
+    _FARE_FLIGHT_PAT   = re.compile(r'\b([A-Z]{2}|[A-Z]\d|\d[A-Z])\s*[-]?\s*(\d{1,4})\b')
+    _DURATION_PAT      = re.compile(r'(\d{1,2})\s*h(?:rs?)?\s*(\d{1,2})?\s*m(?:ins?)?', re.IGNORECASE)
+    _FARE_PAT          = re.compile(r'[₹$]\s*([\d,]+)')
+    _BAGGAGE_PAT       = re.compile(
+        r'(?:baggage|check-in|cabin|checkin)?[:\s]*(\d+)\s*(kg|pc|piece)(?!\s*CO2e)', re.IGNORECASE
+    )
+    _NONSTOP_PAT       = re.compile(r'non[\s-]*stop|direct|nonstop', re.IGNORECASE)
+    _STOPS_PAT         = re.compile(r'(\d)\s*stop', re.IGNORECASE)
 
-    METADATA_INDICATORS = [
+    METADATA_INDICATORS = (
         'departure_date', 'arrival_date', 'flight_number',
         'departure_time', 'arrival_time', '"date":', '"time":',
         'json', 'extract', 'output'
-    ]
+    )
+    _METADATA_PAT = re.compile('|'.join(map(re.escape, METADATA_INDICATORS)))
 
     @staticmethod
     def extract(text: str) -> Dict:
+        # Hints depend only on the text; copy so callers can mutate their dict
+        return copy.deepcopy(HintExtractor._extract_cached(text))
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _extract_cached(text: str) -> Dict:
         hints = {}
+        text_upper = text.upper()
 
         # ── Flight numbers ──────────────────────────────────────────────────
-        flight_matches = re.findall(
-            r'\b([A-Z]{2}|[A-Z]\d|\d[A-Z])\s*[-]?[/\s]?\s*(\d{1,4})\b',
-            text.upper()
-        )
+        flight_matches = HintExtractor._FLIGHT_NUMBER_PAT.findall(text_upper)
         found_flights = []
+        seen_flights: set = set()
         for airline_code, flight_num in flight_matches:
-            if airline_code in AIRLINE_CODES or airline_code in ['LX', 'UK', 'EY']:
-                found_flights.append(f"{airline_code} {flight_num}")
+            if airline_code in AIRLINE_CODES:
+                fn = f"{airline_code} {flight_num}"
+                if fn not in seen_flights:
+                    seen_flights.add(fn)
+                    found_flights.append(fn)
 
         if found_flights:
-            found_flights = list(dict.fromkeys(found_flights))
             hints['all_flight_numbers'] = found_flights
             hints['flight_number'] = found_flights[0]
             airline_code = found_flights[0].split()[0]
@@ -891,16 +1260,13 @@ class HintExtractor:
         # Pass 1: explicit 3-letter IATA tokens
         # Capture character spans (start, end) to avoid matching inside names
         iata_positions: List[Tuple[int, int, str]] = []
-        for m in re.finditer(r'\b([A-Z]{3})\b', text.upper()):
-            code = m.group(1)
-            if code in AIRPORT_CODES and code not in HintExtractor.FALSE_POSITIVE_AIRPORTS:
-                iata_positions.append((m.start(), m.end(), code))
+        for m in HintExtractor._AIRPORT_PAT.finditer(text_upper):
+            iata_positions.append((m.start(), m.end(), m.group(1)))
 
         # Pass 2: full city/airport names → IATA
         text_lower = text.lower()
         city_positions: List[Tuple[int, int, str]] = []
-        for city_name, iata in sorted(HintExtractor._get_city_to_iata().items(),
-                                       key=lambda x: -len(x[0])):
+        for city_name, iata in HintExtractor._cities_longest_first():
             start = 0
             while True:
                 idx = text_lower.find(city_name, start)
@@ -957,17 +1323,18 @@ class HintExtractor:
             hints['arrival_city'] = AIRPORT_CODES.get(arr_code, 'N/A')
 
         # ── Times ───────────────────────────────────────────────────────────
-        time_matches = re.findall(r'(\d{1,2})[:\.](\d{2})\s*(am|pm)?', text, re.IGNORECASE)
         times_24h = []
-        for h, m, ampm in time_matches:
-            hour = int(h)
+        for match in HintExtractor._TIME_PAT.finditer(text):
+            hour = int(match[1])
+            m = match[2]
+            ampm = match[3]
             if ampm:
-                ampm = ampm.lower()
-                if ampm == 'pm' and hour != 12:
-                    hour += 12
-                elif ampm == 'am' and hour == 12:
+                if ampm[0] in 'pP':
+                    if hour != 12:
+                        hour += 12
+                elif hour == 12:
                     hour = 0
-            if 0 <= hour <= 23 and 0 <= int(m) <= 59:
+            if hour <= 23 and int(m) <= 59:
                 times_24h.append(f"{hour:02d}:{m}")
 
         if len(times_24h) >= 2:
@@ -982,10 +1349,10 @@ class HintExtractor:
         for d in found_dates:
             is_metadata = False
             # BUG FIX: case-insensitive search; original was case-sensitive
-            start_idx = text.lower().find(d.lower())
+            start_idx = text_lower.find(d.lower())
             if start_idx > -1:
                 prefix = text[max(0, start_idx-25):start_idx].lower()
-                if any(ind in prefix for ind in HintExtractor.METADATA_INDICATORS):
+                if HintExtractor._METADATA_PAT.search(prefix):
                     is_metadata = True
             if not is_metadata:
                 valid_dates.append(d)
@@ -995,7 +1362,7 @@ class HintExtractor:
             hints['departure_date'] = valid_dates[0]
 
         # ── Durations ───────────────────────────────────────────────────────
-        dur_matches = re.findall(r'(\d{1,2})\s*h(?:rs?)?\s*(\d{1,2})?\s*m(?:ins?)?', text, re.IGNORECASE)
+        dur_matches = HintExtractor._DURATION_PAT.findall(text)
         if dur_matches:
             hints['all_durations'] = [f"{h}h {m or '0'}m" for h, m in dur_matches]
             hints['duration'] = hints['all_durations'][0]
@@ -1010,8 +1377,7 @@ class HintExtractor:
         FARE_MIN_THRESHOLD = 500
 
         fn_positions: List[Tuple[int, str]] = []
-        fn_re = re.compile(r'\b([A-Z]{2}|[A-Z]\d|\d[A-Z])\s*[-]?\s*(\d{1,4})\b')
-        for _m in fn_re.finditer(text.upper()):
+        for _m in HintExtractor._FARE_FLIGHT_PAT.finditer(text_upper):
             _code = _m.group(1)
             if _code in AIRLINE_CODES:
                 fn_positions.append((_m.start(), f"{_code} {_m.group(2)}"))
@@ -1027,7 +1393,7 @@ class HintExtractor:
             search_in = seg[:adult_idx] if adult_idx != -1 else seg
             amounts = [
                 int(m.group(1).replace(',', ''))
-                for m in re.finditer(r'[₹$]\s*([\d,]+)', search_in)
+                for m in HintExtractor._FARE_PAT.finditer(search_in)
             ]
             big = [a for a in amounts if a >= FARE_MIN_THRESHOLD]
             if big:
@@ -1035,7 +1401,7 @@ class HintExtractor:
             # No marker — just return the first big amount in the whole segment
             amounts_all = [
                 int(m.group(1).replace(',', ''))
-                for m in re.finditer(r'[₹$]\s*([\d,]+)', seg)
+                for m in HintExtractor._FARE_PAT.finditer(seg)
             ]
             big_all = [a for a in amounts_all if a >= FARE_MIN_THRESHOLD]
             return big_all[0] if big_all else None
@@ -1058,10 +1424,7 @@ class HintExtractor:
                 hints['saver_fare'] = _fare
 
         # ── Baggage ─────────────────────────────────────────────────────────
-        bag_match = re.search(
-            r'(?:baggage|check-in|cabin|checkin)?[:\s]*(\d+)\s*(kg|pc|piece)(?!\s*CO2e)',
-            text, re.IGNORECASE
-        )
+        bag_match = HintExtractor._BAGGAGE_PAT.search(text)
         if bag_match:
             start_idx = max(0, bag_match.start() - 20)
             context = text[start_idx:bag_match.end()].lower()
@@ -1069,11 +1432,12 @@ class HintExtractor:
                 hints['baggage'] = f"{bag_match.group(1)}{bag_match.group(2).lower()}"
 
         # ── Stops ───────────────────────────────────────────────────────────
-        if re.search(r'non[\s-]*stop|direct|nonstop', text, re.IGNORECASE):
+        if HintExtractor._NONSTOP_PAT.search(text):
             hints['stops'] = 'Non Stop'
-        elif re.search(r'(\d)\s*stop', text, re.IGNORECASE):
-            stop_match = re.search(r'(\d)\s*stop', text, re.IGNORECASE)
-            hints['stops'] = f"{stop_match.group(1)} Stop"
+        else:
+            stop_match = HintExtractor._STOPS_PAT.search(text)
+            if stop_match:
+                hints['stops'] = f"{stop_match.group(1)} Stop"
 
         return hints
 
@@ -1103,12 +1467,13 @@ class DateValidator:
         r'(?:\s+(\d{2}|\d{4}))?$',
         re.IGNORECASE
     )
+    _BARE_DAY_PAT = re.compile(r'^\d{1,2}(st|nd|rd|th)?$', re.IGNORECASE)
 
     @staticmethod
     def is_valid_calendar_date(date_str: str) -> bool:
         if not date_str or date_str in ('N/A', 'None', ''):
             return False
-        if re.match(r'^\d{1,2}(st|nd|rd|th)?$', date_str.strip(), re.IGNORECASE):
+        if DateValidator._BARE_DAY_PAT.match(date_str.strip()):
             return False
         clean = FlightDate.clean_date_string(date_str).strip()
         m = DateValidator._NORM_PAT.match(clean)
@@ -1139,13 +1504,15 @@ class DateValidator:
         original_text: str
     ) -> str:
         if regex_dates:
-            Logger.debug(f"DateValidator: using regex date '{regex_dates[0]}'")
+            if Logger.DEBUG:
+                Logger.debug(f"DateValidator: using regex date '{regex_dates[0]}'")
             return regex_dates[0]
 
         if llm_date and llm_date not in ('N/A', 'None', ''):
             ok, reason = DateValidator.validate_against_text(llm_date, original_text)
             if ok:
-                Logger.debug(f"DateValidator: LLM date validated '{llm_date}'")
+                if Logger.DEBUG:
+                    Logger.debug(f"DateValidator: LLM date validated '{llm_date}'")
                 return llm_date
             else:
                 Logger.warning(f"DateValidator: rejecting LLM date — {reason}")
@@ -1196,9 +1563,45 @@ class FlightValidator:
 
 
 # ==================== FLIGHT POST-PROCESSOR ====================
+class _DigitsOnly(dict):
+    """str.translate table that drops every non-digit (same set as regex \\D)."""
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        keep = codepoint if chr(codepoint).isdecimal() else None
+        self[codepoint] = keep
+        return keep
+
+
 class FlightPostProcessor:
     """Post-process and enhance extracted flight data"""
 
+    _TRAVEL_TIME_PAT = re.compile(r'Travel time:\s*(\d+)\s*hr[s]?\s*(\d+)\s*min[s]?', re.IGNORECASE)
+    _FN_SPACING_PAT  = re.compile(r'^([A-Z]{2})(\d)')
+    _FN_COLLAPSE_PAT = re.compile(r'[-\s]+')
+    _AIRLINE_PAT     = re.compile(r'([A-Z]{2})')
+    _HOURS_PAT       = re.compile(r'(\d+)h')
+    _DIGITS_ONLY     = _DigitsOnly()
+    # Placeholder digits/letters the LLM invents when it has no flight number
+    _PLACEHOLDER_FN_PAT = re.compile(r'1234|5678|9012|XXXX')
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _travel_times(original_text: str) -> Tuple[Tuple[str, str], ...]:
+        # Every flight of a multi-flight result is post-processed against the
+        # same text, so the scan runs once per input rather than once per flight.
+        # The IGNORECASE pattern is its own gate: a str.lower() substring test
+        # would miss spellings it matches, such as 'TİME' (dotted capital I).
+        return tuple(FlightPostProcessor._TRAVEL_TIME_PAT.findall(original_text))
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _normalize_flight_number(flight_number: str) -> Tuple[str, Optional[str]]:
+        """Canonical "XX 1234" spelling plus the airline its prefix maps to."""
+        fn = FlightPostProcessor._FN_COLLAPSE_PAT.sub(' ', flight_number.upper())
+        fn = FlightPostProcessor._FN_SPACING_PAT.sub(r'\1 \2', fn)
+        code = FlightPostProcessor._AIRLINE_PAT.match(fn)
+        return fn.strip(), AIRLINE_CODES.get(code.group(1)) if code else None
+
     @staticmethod
     def process(flight: Dict, hints: Dict, original_text: str,
                 is_multi_flight: bool = False) -> Dict:
@@ -1218,9 +1621,9 @@ class FlightPostProcessor:
         best_date = DateValidator.pick_best_date(llm_date_raw, regex_dates, original_text)
         flight['departure_date'] = best_date
 
-        trip_start_date = datetime.now()
+        trip_start_date = _now()
         if best_date != 'N/A':
-            parsed_date = FlightDate.parse(best_date, datetime.now().year)
+            parsed_date = FlightDate.parse(best_date, trip_start_date.year)
             if parsed_date:
                 flight['departure_date'] = FlightDate.format(parsed_date)
                 trip_start_date = parsed_date
@@ -1260,7 +1663,8 @@ class FlightPostProcessor:
                 llm_val = flight.get(key, '').upper().strip()
                 if (not llm_val or llm_val == 'N/A') and hints.get(hint_key):
                     flight[key] = hints[hint_key]
-                    Logger.debug(f"Multi-flight fill {key}: N/A → {hints[hint_key]}")
+                    if Logger.DEBUG:
+                        Logger.debug(f"Multi-flight fill {key}: N/A → {hints[hint_key]}")
 
         # ═══ 3. VALIDATE AIRPORTS AGAINST MAPPINGS ═══════════════════════════
         for key in ['departure_airport', 'arrival_airport']:
@@ -1306,10 +1710,12 @@ class FlightPostProcessor:
             if flight.get(key) and flight[key] != 'N/A':
                 flight[key] = flight[key].upper().strip()
 
-        if flight.get('departure_airport') in AIRPORT_CODES:
-            flight['departure_city'] = AIRPORT_CODES[flight['departure_airport']]
-        if flight.get('arrival_airport') in AIRPORT_CODES:
-            flight['arrival_city'] = AIRPORT_CODES[flight['arrival_airport']]
+        dep_city = AIRPORT_CODES.get(flight.get('departure_airport'))
+        if dep_city is not None:
+            flight['departure_city'] = dep_city
+        arr_city = AIRPORT_CODES.get(flight.get('arrival_airport'))
+        if arr_city is not None:
+            flight['arrival_city'] = arr_city
 
         # ═══ 6. SEGMENT PROCESSING ═══════════════════════════════════════════
         if not flight.get('segments'):
@@ -1339,10 +1745,9 @@ class FlightPostProcessor:
         segments = flight.get('segments', [])
         reg_flight_nums = hints.get('all_flight_numbers', [])
 
-        text_travel_times = re.findall(
-            r'Travel time:\s*(\d+)\s*hr[s]?\s*(\d+)\s*min[s]?',
-            original_text, re.IGNORECASE
-        )
+        text_travel_times = FlightPostProcessor._travel_times(original_text)
+        # Per-segment "Travel time" lines are only trusted when they line up 1:1
+        use_text_times = len(segments) == len(text_travel_times)
 
         layover_cities = []
         current_cumulative_days = 0
@@ -1397,38 +1802,34 @@ class FlightPostProcessor:
 
             # ── Fix placeholder flight numbers ──────────────────────────────
             fn = str(seg.get('flight_number', '')).upper()
-            if any(x in fn for x in ['1234', '5678', '9012', 'XXXX']) or len(fn) < 3:
+            if FlightPostProcessor._PLACEHOLDER_FN_PAT.search(fn) or len(fn) < 3:
                 if i < len(reg_flight_nums):
-                    Logger.debug(f"Fixing segment {i} flight number: {fn} -> {reg_flight_nums[i]}")
+                    if Logger.DEBUG:
+                        Logger.debug(f"Fixing segment {i} flight number: {fn} -> {reg_flight_nums[i]}")
                     seg['flight_number'] = reg_flight_nums[i]
 
             if seg.get('flight_number') and seg['flight_number'] != 'N/A':
-                sfn = seg['flight_number'].upper().replace('-', ' ').replace('  ', ' ')
-                sfn = re.sub(r'^([A-Z]{2})(\d)', r'\1 \2', sfn)
-                seg['flight_number'] = sfn.strip()
+                seg['flight_number'], airline = FlightPostProcessor._normalize_flight_number(seg['flight_number'])
                 if seg.get('airline') in [None, '', 'N/A']:
-                    code = re.match(r'([A-Z]{2})', sfn)
-                    if code and code.group(1) in AIRLINE_CODES:
-                        seg['airline'] = AIRLINE_CODES[code.group(1)]
+                    if airline is not None:
+                        seg['airline'] = airline
 
             seg_dep_ap  = seg.get('departure_airport', '').upper()
             seg_arr_ap  = seg.get('arrival_airport', '').upper()
             seg_dep_time = seg.get('departure_time')
             seg_arr_time = seg.get('arrival_time')
-            seg_date_obj = trip_start_date + timedelta(days=current_cumulative_days)
+            seg_date_obj = (trip_start_date + timedelta(days=current_cumulative_days)
+                            if current_cumulative_days else trip_start_date)
 
             if i > 0:
                 prev_seg = segments[i - 1]
                 prev_arr_time = prev_seg.get('arrival_time')
 
                 days_between = 0
-                try:
-                    prev_arr_dt = DurationCalculator.parse_time(prev_arr_time)
-                    curr_dep_dt = DurationCalculator.parse_time(seg_dep_time)
-                    if curr_dep_dt and prev_arr_dt and curr_dep_dt < prev_arr_dt:
-                        days_between = 1
-                except Exception:
-                    pass
+                prev_arr_hm = DurationCalculator.parse_hm(prev_arr_time)
+                curr_dep_hm = DurationCalculator.parse_hm(seg_dep_time)
+                if curr_dep_hm is not None and prev_arr_hm is not None and curr_dep_hm < prev_arr_hm:
+                    days_between = 1
 
                 seg['layover_duration'] = DurationCalculator.calculate_layover(
                     prev_arr_time, seg_dep_time, seg_dep_ap, days_between, seg_date_obj
@@ -1436,7 +1837,7 @@ class FlightPostProcessor:
 
                 layover_str = seg['layover_duration']
                 if layover_str != "N/A":
-                    h_match = re.search(r'(\d+)h', layover_str)
+                    h_match = FlightPostProcessor._HOURS_PAT.search(layover_str)
                     if h_match and int(h_match.group(1)) >= 24:
                         extra_days = int(h_match.group(1)) // 24
                         current_cumulative_days += extra_days
@@ -1448,28 +1849,32 @@ class FlightPostProcessor:
 
             seg['accumulated_dep_days'] = current_cumulative_days
 
-            if len(segments) == len(text_travel_times):
+            if use_text_times:
                 h, m = text_travel_times[i]
                 seg['duration'] = f"{h}h {m}m"
+                duration_parts = (int(h), int(m))
             else:
-                seg['duration'] = DurationCalculator.calculate(
+                duration_parts = DurationCalculator.calculate_parts(
                     seg_dep_time, seg_arr_time, seg_dep_ap, seg_arr_ap,
                     days_offset=0, flight_date=seg_date_obj, check_ultra_long=True
                 )
+                seg['duration'] = DurationCalculator.format_parts(duration_parts)
 
             seg['days_offset'] = DayOffsetCalculator.calculate(
                 seg_dep_time, seg_arr_time, seg['duration'],
-                seg_dep_ap, seg_arr_ap, seg_date_obj
+                seg_dep_ap, seg_arr_ap, seg_date_obj, duration_parts
             )
 
             current_cumulative_days += seg['days_offset']
             seg['accumulated_arr_days'] = current_cumulative_days
 
             # City names ALWAYS from mappings.py
-            if seg_dep_ap in AIRPORT_CODES:
-                seg['departure_city'] = AIRPORT_CODES[seg_dep_ap]
-            if seg_arr_ap in AIRPORT_CODES:
-                seg['arrival_city'] = AIRPORT_CODES[seg_arr_ap]
+            dep_city = AIRPORT_CODES.get(seg_dep_ap)
+            if dep_city is not None:
+                seg['departure_city'] = dep_city
+            arr_city = AIRPORT_CODES.get(seg_arr_ap)
+            if arr_city is not None:
+                seg['arrival_city'] = arr_city
 
             if i > 0 and seg.get('layover_duration') and seg.get('layover_duration') != "N/A":
                 layover_ap = seg_dep_ap
@@ -1519,17 +1924,16 @@ class FlightPostProcessor:
                         matched_fare = map_fare
                         break
             if matched_fare is not None:
-                Logger.debug(f"Fare rescued from fare_by_flight: {fn_key} → {matched_fare}")
+                if Logger.DEBUG:
+                    Logger.debug(f"Fare rescued from fare_by_flight: {fn_key} → {matched_fare}")
                 flight['saver_fare'] = matched_fare
 
         if flight.get('saver_fare'):
-            f_str = re.sub(r'[^\d]', '', str(flight['saver_fare']))
+            f_str = str(flight['saver_fare']).translate(FlightPostProcessor._DIGITS_ONLY)
             flight['saver_fare'] = int(f_str) if f_str else None
 
         if flight.get('flight_number') and flight['flight_number'] != 'N/A':
-            mfn = flight['flight_number'].upper().replace('-', ' ').replace('  ', ' ')
-            mfn = re.sub(r'^([A-Z]{2})(\d)', r'\1 \2', mfn)
-            flight['flight_number'] = mfn.strip()
+            flight['flight_number'] = FlightPostProcessor._normalize_flight_number(flight['flight_number'])[0]
 
         # ═══ 9. FINAL VALIDATION (includes airport checks) ════════════════════
         is_valid, errors = FlightValidator.validate(flight)
@@ -1540,7 +1944,7 @@ class FlightPostProcessor:
 
     @staticmethod
     def recalculate_with_date(flight: Dict, new_date_str: str) -> Dict:
-        new_date = FlightDate.parse(new_date_str, datetime.now().year)
+        new_date = FlightDate.parse(new_date_str, _now().year)
         if not new_date:
             Logger.warning(f"Could not parse new date: {new_date_str}")
             return flight
@@ -1554,7 +1958,8 @@ class FlightPostProcessor:
         current_cumulative_days = 0
 
         for i, seg in enumerate(segments):
-            seg_date_obj = trip_start_date + timedelta(days=current_cumulative_days)
+            seg_date_obj = (trip_start_date + timedelta(days=current_cumulative_days)
+                            if current_cumulative_days else trip_start_date)
             seg['departure_date'] = FlightDate.format(seg_date_obj)
 
             seg_dep_ap  = seg.get('departure_airport', '')
@@ -1562,15 +1967,16 @@ class FlightPostProcessor:
             seg_dep_time = seg.get('departure_time')
             seg_arr_time = seg.get('arrival_time')
 
-            seg['duration'] = DurationCalculator.calculate(
+            duration_parts = DurationCalculator.calculate_parts(
                 seg_dep_time, seg_arr_time,
                 seg_dep_ap, seg_arr_ap,
                 days_offset=0, flight_date=seg_date_obj, check_ultra_long=True
             )
+            seg['duration'] = DurationCalculator.format_parts(duration_parts)
 
             seg['days_offset'] = DayOffsetCalculator.calculate(
                 seg_dep_time, seg_arr_time, seg['duration'],
-                seg_dep_ap, seg_arr_ap, seg_date_obj
+                seg_dep_ap, seg_arr_ap, seg_date_obj, duration_parts
             )
 
             if i > 0:
@@ -1578,13 +1984,10 @@ class FlightPostProcessor:
                 prev_arr_time = prev_seg.get('arrival_time')
 
                 days_between = 0
-                try:
-                    prev_arr_dt = DurationCalculator.parse_time(prev_arr_time)
-                    curr_dep_dt = DurationCalculator.parse_time(seg_dep_time)
-                    if curr_dep_dt and prev_arr_dt and curr_dep_dt < prev_arr_dt:
-                        days_between = 1
-                except Exception:
-                    pass
+                prev_arr_hm = DurationCalculator.parse_hm(prev_arr_time)
+                curr_dep_hm = DurationCalculator.parse_hm(seg_dep_time)
+                if curr_dep_hm is not None and prev_arr_hm is not None and curr_dep_hm < prev_arr_hm:
+                    days_between = 1
 
                 seg['layover_duration'] = DurationCalculator.calculate_layover(
                     prev_arr_time, seg_dep_time, seg_dep_ap, days_between, seg_date_obj
@@ -1688,15 +2091,10 @@ Bangkok=BKK, Kuala Lumpur=KUL, Jakarta=CGK, Manila=MNL,
 Phuket=HKT, Bali=DPS, Chiang Mai=CNX, Pattaya=UTP
 
 ══════════════════════════════════════════════════════════════════
-AIRLINE CODE → NAME QUICK REFERENCE
+AIRLINE NAMES
 ══════════════════════════════════════════════════════════════════
-6E=IndiGo, AI=Air India, QP=Akasa Air, SG=SpiceJet, UK=Vistara,
-IX=Air India Express, I5=AirAsia India, G8=GoAir,
-EK=Emirates, QR=Qatar Airways, EY=Etihad Airways,
-SQ=Singapore Airlines, TG=Thai Airways, MH=Malaysia Airlines,
-BA=British Airways, LH=Lufthansa, LX=SWISS, AF=Air France,
-KL=KLM, AA=American Airlines, DL=Delta, UA=United Airlines,
-TK=Turkish Airlines, MS=EgyptAir, ET=Ethiopian Airlines
+Airline codes found in the text are resolved for you under AIRLINES IN TEXT
+in the user message. Use those names; otherwise copy the name from the text.
 
 ══════════════════════════════════════════════════════════════════
 OUTPUT FORMAT — return ONLY this JSON, no markdown, no explanation
@@ -1772,8 +2170,86 @@ Your departure_date must match one of those dates exactly (same day number, same
 If no regex dates are shown → departure_date = "N/A".
 """
 
+    MULTI_FLIGHT_PROMPT = """You are a flight itinerary data extractor. Extract ALL distinct flights from the input text.
+
+══════════════════════════════════════════════════════════════════
+CRITICAL DATE RULE — READ FIRST
+══════════════════════════════════════════════════════════════════
+Today's date and the dates found in the text by regex are given in the
+DATE CONTEXT block at the start of the user message.
+
+- ONLY use dates that appear EXPLICITLY in the text.
+- If regex found dates in the DATE CONTEXT, use ONLY those dates (exact day + month).
+- If no dates are found → set departure_date = "N/A" for ALL flights.
+- NEVER use today's date. NEVER infer or calculate a date.
+
+══════════════════════════════════════════════════════════════════
+EXTRACTION RULES
+══════════════════════════════════════════════════════════════════
+- Output ONLY valid JSON array (no markdown, no explanation).
+- Times: always 24-hour HH:MM. ("3:50 PM" → "15:50")
+- Date format: "DD Mon YY" (e.g. "30 Jan 26"). Two-digit year only.
+- Airport codes: 3-letter IATA uppercase (CCU, SIN, DEL).
+- Duration format: "Xh Ym" (e.g. "2h 30m").
+- Fare: extract as NUMBER only (₹6,314 → 6314). null if not present.
+- Missing fields: "N/A". NEVER "Not Specified".
+- CRITICAL: departure_airport must NEVER equal arrival_airport for any flight or segment.
+
+AIRLINE NAMES:
+Use the names listed under AIRLINES IN TEXT in the user message; otherwise copy the name from the text.
+
+CONNECTING FLIGHTS:
+- Sequential legs sharing a connection → ONE flight object with "segments" array.
+- Distinct origin-destination pairs → separate objects.
+
+OUTPUT FORMAT (JSON ARRAY):
+[
+  {
+    "airline": "Full Airline Name",
+    "flight_number": "XX 1234",
+    "departure_city": "City Name",
+    "departure_airport": "XXX",
+    "departure_date": "DD Mon YY or N/A",
+    "departure_time": "HH:MM",
+    "arrival_city": "City Name",
+    "arrival_airport": "XXX",
+    "arrival_time": "HH:MM",
+    "arrival_next_day": false,
+    "duration": "Xh Ym",
+    "stops": "Non Stop",
+    "baggage": "XXkg",
+    "refundability": "Refundable or N/A",
+    "saver_fare": 12345 or null,
+    "segments": []
+  }
+]
+
+Return an ARRAY even for a single flight.
+FINAL REMINDER: departure_date = "N/A" if no date is in the text.
+FINAL REMINDER: departure_airport != arrival_airport in every object and segment.
+"""
+
+    BULK_FLIGHT_ADDON = """
+══════════════════════════════════════════════════════════════════
+BULK MODE
+══════════════════════════════════════════════════════════════════
+The input contains several independent itineraries, each introduced by a
+"=== FLIGHT n ===" header. Return EXACTLY one object per header, in the same
+order as the headers, even if an itinerary is incomplete.
+"""
+
 
 # ==================== MAIN PARSER ====================
+@lru_cache(maxsize=1)
+def _today_str(minute_bucket: int) -> str:
+    """Prompt date string, formatted once per minute from _now()'s cached clock."""
+    return _now_for_minute(minute_bucket).strftime("%d %b %Y (%A)")
+
+
+def _today() -> str:
+    return _today_str(int(time.time()) // 60)
+
+
 class FlightParser:
     """
     Main flight parser orchestrator.
@@ -1787,7 +2263,51 @@ class FlightParser:
       6. FlightPostProcessor— enrich, validate, compute durations from mappings.py
     """
 
-    def __init__(self):
+    # Required top-level fields and the value used when the LLM leaves one
+    # missing or empty
+    _REQUIRED_FIELDS: Dict[str, Optional[str]] = {
+        "airline": "N/A", "flight_number": "N/A", "departure_city": "N/A",
+        "departure_airport": "N/A", "departure_date": "N/A", "departure_time": "N/A",
+        "arrival_city": "N/A", "arrival_airport": "N/A", "arrival_time": "N/A",
+        "duration": "N/A", "stops": "N/A", "baggage": "N/A", "refundability": "N/A",
+        "saver_fare": None,
+    }
+
+    # Shape of a blank flight; _empty_flight() copies it and fills in the
+    # id and fresh mutable lists.
+    _EMPTY_TEMPLATE: Dict = {
+        "id":              None,
+        "airline":         "N/A",
+        "flight_number":   "N/A",
+        "departure_city":  "N/A",
+        "departure_airport": "N/A",
+        "departure_date":  "N/A",
+        "departure_time":  "N/A",
+        "arrival_city":    "N/A",
+        "arrival_airport": "N/A",
+        "arrival_time":    "N/A",
+        "arrival_next_day": False,
+        "days_offset":     0,
+        "duration":        "N/A",
+        "stops":           "N/A",
+        "baggage":         "N/A",
+        "refundability":   "N/A",
+        "saver_fare":      None,
+        "segments":        None,
+        "parse_errors":    None
+    }
+
+    _RESULT_CACHE_MAX = 512
+
+    _JSON_START_PAT = re.compile(r'[{\[]')
+    # Keys that mark a decoded object as a flight rather than a wrapper
+    _FLIGHT_KEYS = frozenset(_EMPTY_TEMPLATE) - {"id"}
+
+    # Signals that an input lists several itineraries (see _looks_multi)
+    _MULTI_OPTION_PAT = re.compile(r'\b(?:option|itinerary|flight)\s*#?\s*\d+\b', re.IGNORECASE)
+    _FARE_AMOUNT_PAT  = re.compile(r'[₹$€£]\s*\d')
+
+    def __init__(self, cache_enabled: bool = True):
         self.preprocessor  = TextPreprocessor()
         self.hint_extractor = HintExtractor()
         self.post_processor = FlightPostProcessor()
@@ -1799,6 +2319,18 @@ class FlightParser:
             self._gds_parser = None
             Logger.warning("gds_parser.py not found — GDS regex parsing disabled")
 
+        # System prompts are kept byte-identical across calls so providers can
+        # serve them from the prompt cache; per-call context goes in the user turn.
+        self._system_prompt       = LLMPrompts.SYSTEM_PROMPT
+        self._system_prompt_multi = LLMPrompts.SYSTEM_PROMPT + "\n" + LLMPrompts.MULTI_SEGMENT_ADDON
+        self._system_prompt_bulk  = LLMPrompts.MULTI_FLIGHT_PROMPT + LLMPrompts.BULK_FLIGHT_ADDON
+
+        # LRU of finished extract_flight results keyed by preprocessed text, so
+        # retries and duplicate rows skip the LLM round-trip entirely.
+        self.cache_enabled = cache_enabled
+        self._result_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+
     def _try_gds(self, raw_text: str) -> Optional[List[Dict]]:
         if self._gds_parser is None:
             return None
@@ -1808,41 +2340,136 @@ class FlightParser:
         flights = self._gds_parser.parse(raw_text)
         return flights if flights else None
 
+    @staticmethod
+    def _llm_payload(prompt: str, text: str, max_tokens: int) -> Dict:
+        return {
+            "model": _QP_CONFIG.model,
+            "messages": [
+                {"role": "system", "content": [{
+                    "type": "text",
+                    "text": prompt,
+                    "cache_control": {"type": "ephemeral", "ttl": "1h"}
+                }]},
+                {"role": "user",   "content": text}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": _QP_CONFIG.temperature
+        }
+
+    @staticmethod
+    def _strip_fences(content: str) -> str:
+        # Skip any ```json fence or preamble straight to the first JSON
+        # bracket and drop a trailing fence, in one pass each.
+        content = content.strip()
+        m = FlightParser._JSON_START_PAT.search(content)
+        if m:
+            content = content[m.start():]
+        return content.rstrip(" \t\r\n`")
+
     def _call_llm_raw(self, prompt: str, text: str, max_tokens: int = MAX_TOKENS) -> Optional[str]:
         """
         Make the LLM API call and return the raw content string.
         Strips markdown fences. Returns None on HTTP / network error.
         """
         try:
-            response = requests.post(
-                OPENROUTER_URL,
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": MODEL,
-                    "messages": [
-                        {"role": "system", "content": prompt},
-                        {"role": "user",   "content": text}
-                    ],
-                    "max_tokens": max_tokens,
-                    "temperature": TEMPERATURE
-                },
+            response = _SESSION.post(
+                _QP_CONFIG.url,
+                json=self._llm_payload(prompt, text, max_tokens),
                 timeout=60
             )
             if response.status_code != 200:
                 Logger.error(f"API error {response.status_code}: {response.text}")
                 return None
-            content = response.json()["choices"][0]["message"]["content"].strip()
-            # Strip markdown code fences (```json ... ``` or ``` ... ```)
-            content = re.sub(r'^```(?:json)?\s*', '', content, flags=re.IGNORECASE)
-            content = re.sub(r'\s*```$', '', content)
-            return content.strip()
+            content = _json_loads(response.content)["choices"][0]["message"]["content"]
+            return self._strip_fences(content)
         except Exception as e:
             Logger.error(f"LLM call failed: {e}")
             return None
 
+    def _stream_llm_content(self, prompt: str, text: str, max_tokens: int = MAX_TOKENS) -> Iterator[str]:
+        """
+        Streaming counterpart of _call_llm_raw: yields content deltas from the
+        server-sent events as they arrive. Yields nothing on HTTP / network error.
+        """
+        payload = self._llm_payload(prompt, text, max_tokens)
+        payload["stream"] = True
+        try:
+            with _SESSION.post(_QP_CONFIG.url, json=payload, timeout=60, stream=True) as response:
+                if response.status_code != 200:
+                    Logger.error(f"API error {response.status_code}: {response.text}")
+                    return
+                for raw_line in response.iter_lines():
+                    # SSE comments (": OPENROUTER PROCESSING") and blank keep-alives
+                    if not raw_line.startswith(b"data:"):
+                        continue
+                    data = raw_line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+                    choices = _json_loads(data).get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if delta:
+                        yield delta
+        except Exception as e:
+            Logger.error(f"LLM stream failed: {e}")
+
+    def _iter_llm_list(self, prompt: str, text: str, max_tokens: int = MAX_TOKENS) -> Iterator[Dict]:
+        """
+        Stream a JSON array response and yield each top-level object as soon as
+        its closing brace arrives. Anything that is not a bare array of flights
+        (a wrapper object such as {"flights": [...]}, a first object with no
+        flight keys) or a stream that ends before the closing ']' goes through
+        the same recovery as _call_llm_list; only objects not yet yielded are
+        yielded from it.
+        """
+        decoder = json.JSONDecoder()
+        content = ""
+        pos = -1            # start of the next object; -1 until the first bracket arrives
+        streaming = True    # False once the reply needs the buffered parse
+        closed = False
+        yielded = 0
+        for delta in self._stream_llm_content(prompt, text, max_tokens):
+            content += delta
+            # An object can only have completed if this delta closed a brace
+            if not streaming or closed or '}' not in delta:
+                continue
+            while True:
+                if pos < 0:
+                    m = self._JSON_START_PAT.search(content)
+                    if not m:
+                        break
+                    if content[m.start()] != '[':
+                        streaming = False
+                        break
+                    pos = m.start() + 1
+                while pos < len(content) and content[pos] in ' \t\n\r,':
+                    pos += 1
+                if pos >= len(content):
+                    break
+                if content[pos] == ']':
+                    closed = True
+                    break
+                if content[pos] != '{':
+                    streaming = False
+                    break
+                try:
+                    obj, end = decoder.raw_decode(content, pos)
+                except json.JSONDecodeError:
+                    break  # still incomplete — wait for more deltas
+                if not isinstance(obj, dict) or not (yielded or obj.keys() & self._FLIGHT_KEYS):
+                    streaming = False
+                    break
+                pos = end
+                yielded += 1
+                yield obj
+
+        if streaming and pos >= 0 and content[pos:].lstrip(' \t\n\r,').startswith(']'):
+            return
+        if content:
+            recovered = self._parse_llm_list(self._strip_fences(content)) or []
+            for obj in recovered[yielded:]:
+                if isinstance(obj, dict):
+                    yield obj
+
     def _call_llm(self, prompt: str, text: str, max_tokens: int = MAX_TOKENS) -> Optional[Dict]:
         """Call LLM expecting a single JSON object ({ ... }). Returns dict or None."""
         content = self._call_llm_raw(prompt, text, max_tokens)
@@ -1856,10 +2483,11 @@ class FlightParser:
             return None
         json_str = content[start:end + 1]
         try:
-            return json.loads(json_str)
+            return _json_loads(json_str)
         except json.JSONDecodeError as e:
             Logger.error(f"JSON parse error (object): {e}")
-            Logger.debug(f"Offending content: {json_str[:300]}")
+            if Logger.DEBUG:
+                Logger.debug(f"Offending content: {json_str[:300]}")
             return None
 
     def _call_llm_list(self, prompt: str, text: str, max_tokens: int = MAX_TOKENS) -> Optional[List[Dict]]:
@@ -1874,15 +2502,19 @@ class FlightParser:
         content = self._call_llm_raw(prompt, text, max_tokens)
         if not content:
             return None
+        return self._parse_llm_list(content)
 
+    def _parse_llm_list(self, content: str) -> Optional[List[Dict]]:
+        """Parse fence-stripped LLM content into a list of objects (see _call_llm_list)."""
         # ── Attempt 1: clean array parse ──────────────────────────────────
         arr_start = content.find('[')
         arr_end   = content.rfind(']')
         if arr_start != -1 and arr_end != -1 and arr_end > arr_start:
             try:
-                result = json.loads(content[arr_start:arr_end + 1])
+                result = _json_loads(content[arr_start:arr_end + 1])
                 if isinstance(result, list):
-                    Logger.debug(f"_call_llm_list: clean parse → {len(result)} item(s)")
+                    if Logger.DEBUG:
+                        Logger.debug(f"_call_llm_list: clean parse → {len(result)} item(s)")
                     return result
             except json.JSONDecodeError:
                 pass  # fall through to recovery
@@ -1892,7 +2524,7 @@ class FlightParser:
         obj_end   = content.rfind('}')
         if obj_start != -1 and obj_end != -1 and (arr_start == -1 or obj_start < arr_start):
             try:
-                result = json.loads(content[obj_start:obj_end + 1])
+                result = _json_loads(content[obj_start:obj_end + 1])
                 if isinstance(result, dict):
                     Logger.warning("_call_llm_list: LLM returned object, wrapping in list")
                     return [result]
@@ -1936,38 +2568,33 @@ class FlightParser:
         return None
 
     def _empty_flight(self) -> Dict:
-        return {
-            "id":              str(uuid.uuid4()),
-            "airline":         "N/A",
-            "flight_number":   "N/A",
-            "departure_city":  "N/A",
-            "departure_airport": "N/A",
-            "departure_date":  "N/A",
-            "departure_time":  "N/A",
-            "arrival_city":    "N/A",
-            "arrival_airport": "N/A",
-            "arrival_time":    "N/A",
-            "arrival_next_day": False,
-            "days_offset":     0,
-            "duration":        "N/A",
-            "stops":           "N/A",
-            "baggage":         "N/A",
-            "refundability":   "N/A",
-            "saver_fare":      None,
-            "segments":        [],
-            "parse_errors":    []
-        }
+        flight = dict(self._EMPTY_TEMPLATE)
+        flight["id"]           = str(uuid.uuid4())
+        flight["segments"]     = []
+        flight["parse_errors"] = []
+        return flight
 
-    def _build_prompt(self, has_layover: bool, regex_dates: List[str], today_str: str) -> str:
-        prompt = LLMPrompts.SYSTEM_PROMPT
-        if has_layover:
-            prompt += "\n" + LLMPrompts.MULTI_SEGMENT_ADDON
+    def _build_prompt(self, has_layover: bool) -> str:
+        return self._system_prompt_multi if has_layover else self._system_prompt
+
+    def _build_user_message(self, text: str, regex_dates: List[str], today_str: str,
+                            flight_numbers: List[str] = ()) -> str:
+        """
+        Prefix the input text with the per-call date context and the names of
+        the airline codes found in it, so the system prompt needs no code table.
+        """
         dates_str = ", ".join(regex_dates) if regex_dates else "NONE FOUND"
-        prompt += LLMPrompts.DATE_INJECTION_TEMPLATE.format(
+        date_context = LLMPrompts.DATE_INJECTION_TEMPLATE.format(
             today=today_str,
             regex_dates=dates_str
         )
-        return prompt
+        codes = dict.fromkeys(fn.split()[0] for fn in flight_numbers)
+        airlines = ", ".join(f"{code}={AIRLINE_CODES[code]}" for code in codes if code in AIRLINE_CODES)
+        return (
+            f"{date_context.strip()}\n\n"
+            f"AIRLINES IN TEXT: {airlines or 'NONE FOUND'}\n\n"
+            f"INPUT TEXT:\n{text}"
+        )
 
     def extract_flight(self, raw_text: str, has_layover: bool = False) -> Dict:
         gds_flights = self._try_gds(raw_text)
@@ -1976,14 +2603,44 @@ class FlightParser:
 
         processed_text = self.preprocessor.process(raw_text)
         hints = self.hint_extractor.extract(processed_text)
-        Logger.debug(f"Extracted hints: {json.dumps(hints, indent=2)}")
+        return self._extract_flight_llm(processed_text, hints, has_layover)
+
+    def _extract_flight_llm(self, processed_text: str, hints: Dict, has_layover: bool = False) -> Dict:
+        """
+        LLM half of extract_flight, for callers that have already ruled out GDS
+        input and hold the preprocessed text and hints.
+        """
+        if Logger.DEBUG:
+            Logger.debug(f"Extracted hints: {json.dumps(hints, indent=2)}")
 
         regex_dates = hints.get('all_dates', [])
-        today_str   = datetime.now().strftime("%d %b %Y (%A)")
-        prompt      = self._build_prompt(has_layover, regex_dates, today_str)
+        today_str   = _today()
+
+        cache_key = None
+        if self.cache_enabled:
+            digest = hashlib.blake2b(processed_text.encode(), digest_size=16).hexdigest()
+            cache_key = f"{digest}:{int(has_layover)}:{today_str}"
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                Logger.debug("extract_flight: result cache hit")
+                return cached
+
+        prompt      = self._build_prompt(has_layover)
+        user_msg    = self._build_user_message(
+            processed_text, regex_dates, today_str, hints.get('all_flight_numbers', [])
+        )
 
-        token_limit = MAX_TOKENS * 2 if has_layover else MAX_TOKENS
-        data = self._call_llm(prompt, processed_text, token_limit)
+        # Layover responses always get the doubled cap, since hint extraction
+        # misses flight numbers on exactly the messy inputs with the longest
+        # segment JSON; itineraries with many flight numbers get more on top.
+        token_limit = _QP_CONFIG.max_tokens
+        if has_layover:
+            n_segs = len(hints.get('all_flight_numbers', []))
+            token_limit = min(
+                max(_QP_CONFIG.max_tokens * 2, _QP_CONFIG.max_tokens + 250 * n_segs),
+                _QP_CONFIG.max_output_tokens,
+            )
+        data = self._call_llm(prompt, user_msg, token_limit)
 
         if not data:
             Logger.warning("LLM returned no data, using fallback")
@@ -1993,146 +2650,250 @@ class FlightParser:
 
         data["id"] = str(uuid.uuid4())
 
-        required_fields = [
-            "airline", "flight_number", "departure_city", "departure_airport",
-            "departure_date", "departure_time", "arrival_city", "arrival_airport",
-            "arrival_time", "duration", "stops", "baggage", "refundability", "saver_fare"
-        ]
-        for field in required_fields:
-            if field not in data or data[field] in [None, "", []]:
-                data[field] = "N/A" if field != "saver_fare" else None
+        for field, default in self._REQUIRED_FIELDS.items():
+            value = data.get(field)
+            if value is None or value == "" or value == []:
+                data[field] = default
 
-        if "segments" not in data:
+        # Drop malformed segment payloads (non-list, or non-object entries)
+        # before they reach the post-processor
+        segments = data.get("segments")
+        if not isinstance(segments, list):
             data["segments"] = []
+        elif not all(isinstance(seg, dict) for seg in segments):
+            data["segments"] = [seg for seg in segments if isinstance(seg, dict)]
 
         data = self.post_processor.process(data, hints, processed_text)
-        Logger.debug(f"Final departure_date: {data.get('departure_date')}")
+        if Logger.DEBUG:
+            Logger.debug(f"Final departure_date: {data.get('departure_date')}")
+        if cache_key is not None:
+            self._cache_put(cache_key, data)
         return data
 
-    def extract_multiple_flights(self, raw_text: str) -> List[Dict]:
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is None:
+                return None
+            self._result_cache.move_to_end(key)
+        result = copy.deepcopy(cached)
+        result["id"] = str(uuid.uuid4())
+        return result
+
+    def _cache_put(self, key: str, flight: Dict) -> None:
+        snapshot = copy.deepcopy(flight)
+        with self._result_cache_lock:
+            self._result_cache[key] = snapshot
+            self._result_cache.move_to_end(key)
+            if len(self._result_cache) > self._RESULT_CACHE_MAX:
+                self._result_cache.popitem(last=False)
+
+    def extract_flights_batch(self, texts: List[str], has_layover: bool = False,
+                              max_workers: int = 8) -> List[Dict]:
+        """
+        Run extract_flight over several itineraries concurrently, preserving
+        input order. Each worker blocks on its own LLM round-trip over the
+        shared keep-alive session, so wall time is close to the slowest call.
+        Repeated texts are extracted once; their later copies are answered
+        afterwards from the result cache.
+        """
+        if not texts:
+            return []
+        unique = list(dict.fromkeys(texts))
+        if len(unique) == 1:
+            first = {unique[0]: self.extract_flight(unique[0], has_layover)}
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as pool:
+                first = dict(zip(unique, pool.map(lambda t: self.extract_flight(t, has_layover), unique)))
+        return [
+            first.pop(t) if t in first else self.extract_flight(t, has_layover)
+            for t in texts
+        ]
+
+    def extract_flights_bulk(self, texts: List[str]) -> List[List[Dict]]:
+        """
+        Extract the flights of several input texts with as few LLM round-trips
+        as possible: itineraries are packed into numbered user messages under
+        the cached multi-flight system prompt, in chunks small enough for the
+        model's output limit. GDS inputs are parsed locally.
+
+        Returns one list per input text, in input order: a GDS input yields
+        every itinerary it contains, any other input a single flight. A chunk
+        whose reply has the wrong number of objects falls back to per-item
+        extraction.
+        """
+        results: List[Optional[List[Dict]]] = [None] * len(texts)
+        pending: List[Tuple[int, str, Dict]] = []
+        for i, raw_text in enumerate(texts):
+            gds_flights = self._try_gds(raw_text)
+            if gds_flights:
+                results[i] = gds_flights
+                continue
+            processed_text = self.preprocessor.process(raw_text)
+            pending.append((i, processed_text, self.hint_extractor.extract(processed_text)))
+
+        per_item = _QP_CONFIG.max_tokens * 2
+        chunk_size = max(1, _QP_CONFIG.max_output_tokens // per_item)
+        for c in range(0, len(pending), chunk_size):
+            chunk = pending[c:c + chunk_size]
+            for (i, _, _), flight in zip(chunk, self._extract_bulk_chunk(chunk, per_item)):
+                results[i] = [flight]
+        return results
+
+    def _extract_bulk_chunk(self, chunk: List[Tuple[int, str, Dict]], per_item: int) -> List[Dict]:
+        """One packed LLM call for a chunk of extract_flights_bulk inputs."""
+        if len(chunk) == 1:
+            _, processed_text, hints = chunk[0]
+            return [self._extract_flight_llm(processed_text, hints)]
+
+        packed = "\n\n".join(
+            f"=== FLIGHT {n} ===\n{processed_text}"
+            for n, (_, processed_text, _) in enumerate(chunk, 1)
+        )
+        regex_dates = list(dict.fromkeys(
+            d for _, _, hints in chunk for d in hints.get('all_dates', [])
+        ))
+        flight_numbers = [
+            fn for _, _, hints in chunk for fn in hints.get('all_flight_numbers', [])
+        ]
+        user_msg = self._build_user_message(packed, regex_dates, _today(), flight_numbers)
+        data = self._call_llm_list(
+            self._system_prompt_bulk, user_msg,
+            max_tokens=min(max(2000, per_item * len(chunk)), _QP_CONFIG.max_output_tokens)
+        )
+        if data and len(data) == len(chunk) and all(isinstance(item, dict) for item in data):
+            return [
+                self._flight_from_item(item, hints, processed_text)
+                for item, (_, processed_text, hints) in zip(data, chunk)
+            ]
+
+        Logger.warning(
+            f"Bulk extraction returned {len(data) if data else 0} of {len(chunk)} "
+            f"flights — falling back to per-item extraction"
+        )
+        with ThreadPoolExecutor(max_workers=min(8, len(chunk))) as pool:
+            return list(pool.map(lambda p: self._extract_flight_llm(p[1], p[2]), chunk))
+
+    def _looks_multi(self, processed_text: str, hints: Dict) -> bool:
+        """Cheap check for inputs that list more than one itinerary."""
+        if self._MULTI_OPTION_PAT.search(processed_text):
+            return True
+        if len(self._FARE_AMOUNT_PAT.findall(processed_text)) > 1:
+            return True
+        if len(hints.get('all_dates', [])) > 1:
+            return True
+        return len(hints.get('all_times', [])) > 2
+
+    def _prepare_multi(self, raw_text: str) -> Tuple[Optional[List[Dict]], str, Dict, str]:
+        """
+        Shared front half of the multi-flight entry points. Returns
+        (flights, processed_text, hints, user_msg); flights is set when the
+        input was answered without the multi-flight prompt.
+        """
         gds_flights = self._try_gds(raw_text)
         if gds_flights:
             Logger.info(f"GDS parser returned {len(gds_flights)} itinerary(ies)")
-            return gds_flights
+            return gds_flights, "", {}, ""
 
         processed_text = self.preprocessor.process(raw_text)
         hints = self.hint_extractor.extract(processed_text)
 
-        regex_dates = hints.get('all_dates', [])
-        today_str   = datetime.now().strftime("%d %b %Y (%A)")
-        dates_str   = ", ".join(regex_dates) if regex_dates else "NONE FOUND"
-
-        MULTI_FLIGHT_PROMPT = f"""You are a flight itinerary data extractor. Extract ALL distinct flights from the input text.
-
-══════════════════════════════════════════════════════════════════
-CRITICAL DATE RULE — READ FIRST
-══════════════════════════════════════════════════════════════════
-Today: {today_str}
-Dates found in text by regex: {dates_str}
-
-- ONLY use dates that appear EXPLICITLY in the text.
-- If regex found dates above, use ONLY those dates (exact day + month).
-- If no dates are found → set departure_date = "N/A" for ALL flights.
-- NEVER use today's date. NEVER infer or calculate a date.
-
-══════════════════════════════════════════════════════════════════
-EXTRACTION RULES
-══════════════════════════════════════════════════════════════════
-- Output ONLY valid JSON array (no markdown, no explanation).
-- Times: always 24-hour HH:MM. ("3:50 PM" → "15:50")
-- Date format: "DD Mon YY" (e.g. "30 Jan 26"). Two-digit year only.
-- Airport codes: 3-letter IATA uppercase (CCU, SIN, DEL).
-- Duration format: "Xh Ym" (e.g. "2h 30m").
-- Fare: extract as NUMBER only (₹6,314 → 6314). null if not present.
-- Missing fields: "N/A". NEVER "Not Specified".
-- CRITICAL: departure_airport must NEVER equal arrival_airport for any flight or segment.
-
-AIRLINE CODES:
-6E=IndiGo, AI=Air India, QP=Akasa Air, SG=SpiceJet, UK=Vistara, G8=GoAir, I5=AirAsia India,
-IX=Air India Express, QR=Qatar Airways, EK=Emirates, SQ=Singapore Airlines, TG=Thai Airways,
-BA=British Airways, LH=Lufthansa, EY=Etihad, TK=Turkish Airlines, LX=SWISS
+        # One flight signature and nothing that looks like a list of options →
+        # the single-flight prompt is smaller and cheaper and gives the same result.
+        if len(hints.get('all_flight_numbers', [])) <= 1 and not self._looks_multi(processed_text, hints):
+            Logger.info("Single itinerary detected — using single-flight extraction")
+            has_layover = hints.get('stops', 'Non Stop') != 'Non Stop'
+            return [self._extract_flight_llm(processed_text, hints, has_layover)], processed_text, hints, ""
 
-CONNECTING FLIGHTS:
-- Sequential legs sharing a connection → ONE flight object with "segments" array.
-- Distinct origin-destination pairs → separate objects.
+        regex_dates = hints.get('all_dates', [])
+        today_str   = _today()
+        user_msg    = self._build_user_message(
+            processed_text, regex_dates, today_str, hints.get('all_flight_numbers', [])
+        )
+        return None, processed_text, hints, user_msg
 
-OUTPUT FORMAT (JSON ARRAY):
-[
-  {{
-    "airline": "Full Airline Name",
-    "flight_number": "XX 1234",
-    "departure_city": "City Name",
-    "departure_airport": "XXX",
-    "departure_date": "DD Mon YY or N/A",
-    "departure_time": "HH:MM",
-    "arrival_city": "City Name",
-    "arrival_airport": "XXX",
-    "arrival_time": "HH:MM",
-    "arrival_next_day": false,
-    "duration": "Xh Ym",
-    "stops": "Non Stop",
-    "baggage": "XXkg",
-    "refundability": "Refundable or N/A",
-    "saver_fare": 12345 or null,
-    "segments": []
-  }}
-]
+    def _flight_from_item(self, item: Dict, hints: Dict, processed_text: str) -> Dict:
+        flight = {
+            "id":              str(uuid.uuid4()),
+            "airline":         item.get("airline", "N/A"),
+            "flight_number":   item.get("flight_number", "N/A"),
+            "departure_city":  item.get("departure_city", "N/A"),
+            "departure_airport": item.get("departure_airport", "N/A"),
+            "departure_date":  item.get("departure_date", "N/A"),
+            "departure_time":  item.get("departure_time", "N/A"),
+            "arrival_city":    item.get("arrival_city", "N/A"),
+            "arrival_airport": item.get("arrival_airport", "N/A"),
+            "arrival_time":    item.get("arrival_time", "N/A"),
+            "arrival_next_day": item.get("arrival_next_day", False),
+            "duration":        item.get("duration", "N/A"),
+            "stops":           item.get("stops", "N/A"),
+            "baggage":         item.get("baggage", "N/A"),
+            "refundability":   item.get("refundability", "N/A"),
+            "saver_fare":      item.get("saver_fare"),
+            "segments":        item.get("segments", [])
+        }
+        return self.post_processor.process(
+            flight, hints, processed_text, is_multi_flight=True
+        )
 
-Return an ARRAY even for a single flight.
-FINAL REMINDER: departure_date = "N/A" if no date is in the text.
-FINAL REMINDER: departure_airport != arrival_airport in every object and segment.
-"""
+    def extract_multiple_flights(self, raw_text: str) -> List[Dict]:
+        ready, processed_text, hints, user_msg = self._prepare_multi(raw_text)
+        if ready is not None:
+            return ready
 
-        data = self._call_llm_list(MULTI_FLIGHT_PROMPT, processed_text, max_tokens=2000)
+        data = self._call_llm_list(LLMPrompts.MULTI_FLIGHT_PROMPT, user_msg, max_tokens=2000)
 
         if not data:
             Logger.warning("Multi-flight extraction failed — falling back to single-flight extraction")
             # Don't give up: try extracting as one possibly-segmented flight
-            single = self.extract_flight(raw_text)
+            single = self._extract_flight_llm(processed_text, hints)
             return [single]
 
         if not isinstance(data, list):
             data = [data]
 
-        flights = []
-        for item in data:
-            flight = {
-                "id":              str(uuid.uuid4()),
-                "airline":         item.get("airline", "N/A"),
-                "flight_number":   item.get("flight_number", "N/A"),
-                "departure_city":  item.get("departure_city", "N/A"),
-                "departure_airport": item.get("departure_airport", "N/A"),
-                "departure_date":  item.get("departure_date", "N/A"),
-                "departure_time":  item.get("departure_time", "N/A"),
-                "arrival_city":    item.get("arrival_city", "N/A"),
-                "arrival_airport": item.get("arrival_airport", "N/A"),
-                "arrival_time":    item.get("arrival_time", "N/A"),
-                "arrival_next_day": item.get("arrival_next_day", False),
-                "duration":        item.get("duration", "N/A"),
-                "stops":           item.get("stops", "N/A"),
-                "baggage":         item.get("baggage", "N/A"),
-                "refundability":   item.get("refundability", "N/A"),
-                "saver_fare":      item.get("saver_fare"),
-                "segments":        item.get("segments", [])
-            }
-            flight = self.post_processor.process(
-                flight, hints, processed_text, is_multi_flight=True
-            )
-            flights.append(flight)
+        flights = [self._flight_from_item(item, hints, processed_text) for item in data]
 
         Logger.info(f"Extracted {len(flights)} flights")
         return flights
 
+    def iter_flights(self, raw_text: str) -> Iterator[Dict]:
+        """
+        Streaming variant of extract_multiple_flights: the LLM response is read
+        as server-sent events and each flight is post-processed and yielded as
+        soon as the model finishes emitting its object.
+        """
+        ready, processed_text, hints, user_msg = self._prepare_multi(raw_text)
+        if ready is not None:
+            yield from ready
+            return
+
+        count = 0
+        for item in self._iter_llm_list(LLMPrompts.MULTI_FLIGHT_PROMPT, user_msg, max_tokens=2000):
+            count += 1
+            yield self._flight_from_item(item, hints, processed_text)
+
+        if not count:
+            Logger.warning("Multi-flight extraction failed — falling back to single-flight extraction")
+            yield self._extract_flight_llm(processed_text, hints)
+            return
+        Logger.info(f"Extracted {count} flights")
+
 
 # ==================== LEGACY COMPATIBILITY ====================
+@lru_cache(maxsize=1)
+def _default_parser() -> FlightParser:
+    """Shared parser for the module-level helpers (its result cache is lock-guarded)."""
+    return FlightParser()
+
 def empty_flight():
-    return FlightParser()._empty_flight()
+    return _default_parser()._empty_flight()
 
 def extract_flight(raw_text: str, has_layover: bool = False) -> Dict:
-    return FlightParser().extract_flight(raw_text, has_layover)
+    return _default_parser().extract_flight(raw_text, has_layover)
 
 def extract_multiple_flights(raw_text: str, has_layover: bool = False) -> List[Dict]:
-    return FlightParser().extract_multiple_flights(raw_text)
+    return _default_parser().extract_multiple_flights(raw_text)
 
 def validate_flight(flight: Dict) -> Tuple[bool, List[str]]:
     return FlightValidator.validate(flight)
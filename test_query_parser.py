@@ -0,0 +1,209 @@
+import os
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+
+from query_parser import FlightDate
+
+
+# ---------- FlightDate.is_in_text ----------
+def test_is_in_text_does_not_join_neighbouring_digits():
+    text = "Flight 6E 2341 5 Feb DEL-BOM"
+    assert not FlightDate.is_in_text("15 Feb", text)
+    assert FlightDate.is_in_text("5 Feb", text)
+
+
+def test_is_in_text_flexible_whitespace():
+    assert FlightDate.is_in_text("30 Jan 26", "Departs 30Jan 26 at 06:00")
+
+
+def test_is_in_text_day_month_orders_and_gds():
+    assert FlightDate.is_in_text("30 Jan 26", "Departs Jan 30, 2026")
+    assert FlightDate.is_in_text("30 Jan 26", "EY 156 E 30JAN26 PRG AUH")
+    assert not FlightDate.is_in_text("30 Jan 26", "Departs 3 Jan 2026")
+
+
+# ---------- HTTP session ----------
+def test_session_retries_only_status_codes():
+    from query_parser import _SESSION
+    retry = _SESSION.get_adapter("https://openrouter.ai").max_retries
+    assert retry.read == 0 and retry.connect == 0 and retry.other == 0
+    assert 429 in retry.status_forcelist
+
+
+# ---------- FlightParser.extract_flights_bulk ----------
+GDS_TEXT = """
+EY 156 E 18APR 6*PRGAUH DK1 1120 1905 18APR E 0 789 M SEE RTSVC
+EY 232 E 18APR 6*AUHBLR DK1 2135 0315 19APR E 0 789 M SEE RTSVC
+
+AI 302 Y 25APR 5*DELSIN HK1 2315 0615 26APR E 0 788 M
+"""
+
+
+def _bulk_parser(monkeypatch, max_output_tokens=16384):
+    from query_parser import FlightParser, _QP_CONFIG
+    monkeypatch.setattr(_QP_CONFIG, "max_output_tokens", max_output_tokens)
+    parser = FlightParser(cache_enabled=False)
+    calls = {"bulk": [], "single": []}
+
+    def fake_list(prompt, text, max_tokens=0):
+        n = text.count("=== FLIGHT ")
+        calls["bulk"].append((n, max_tokens))
+        return [{"airline": "IndiGo"} for _ in range(n)]
+
+    def fake_single(processed_text, hints, has_layover=False):
+        calls["single"].append(processed_text)
+        return {"single": processed_text}
+
+    monkeypatch.setattr(parser, "_call_llm_list", fake_list)
+    monkeypatch.setattr(parser, "_extract_flight_llm", fake_single)
+    monkeypatch.setattr(parser, "_flight_from_item", lambda item, hints, text: dict(item, text=text))
+    return parser, calls
+
+
+def test_bulk_chunks_to_output_limit(monkeypatch):
+    # 800 tokens per item under a 4000-token ceiling → chunks of 5, 5 and a lone 1
+    parser, calls = _bulk_parser(monkeypatch, max_output_tokens=4000)
+    texts = [f"DEL to BOM option {n}" for n in range(11)]
+    results = parser.extract_flights_bulk(texts)
+
+    assert [n for n, _ in calls["bulk"]] == [5, 5]
+    assert all(max_tokens <= 4000 for _, max_tokens in calls["bulk"])
+    assert calls["single"] == [parser.preprocessor.process(texts[-1])]
+    processed = [parser.preprocessor.process(t) for t in texts]
+    assert [r[0].get("text", r[0].get("single")) for r in results] == processed
+
+
+def test_bulk_falls_back_per_item_on_count_mismatch(monkeypatch):
+    parser, calls = _bulk_parser(monkeypatch)
+    monkeypatch.setattr(parser, "_call_llm_list", lambda prompt, text, max_tokens=0: [{}])
+    texts = ["DEL to BOM", "CCU to BLR", "MAA to HYD"]
+    results = parser.extract_flights_bulk(texts)
+
+    assert [r[0]["single"] for r in results] == [parser.preprocessor.process(t) for t in texts]
+
+
+def test_bulk_returns_every_gds_itinerary(monkeypatch):
+    parser, calls = _bulk_parser(monkeypatch)
+    results = parser.extract_flights_bulk([GDS_TEXT, "DEL to BOM"])
+
+    assert [f["flight_number"] for f in results[0]] == ["EY 156", "AI 302"]
+    assert results[1] == [{"single": parser.preprocessor.process("DEL to BOM")}]
+    assert calls["bulk"] == []
+
+
+# ---------- TextPreprocessor GDS times ----------
+def test_gds_times_left_alone_in_free_text():
+    from query_parser import TextPreprocessor
+    text = "Flying Hyderabad to Singapore 0930 1145 economy"
+    assert TextPreprocessor.process(text) == text
+
+
+def test_gds_times_formatted_after_airport_pair():
+    from query_parser import TextPreprocessor
+    out = TextPreprocessor.process("EY 156 E 18APR 6*PRGAUH DK1 1120 1905 18APR")
+    assert "PRG AUH DK1 11:20 19:05" in out
+
+
+# ---------- FlightParser._extract_flight_llm token limit ----------
+def _token_limit_for(monkeypatch, hints, has_layover):
+    from query_parser import FlightParser
+    parser = FlightParser(cache_enabled=False)
+    seen = []
+    monkeypatch.setattr(parser, "_call_llm", lambda prompt, msg, limit: seen.append(limit))
+    parser._extract_flight_llm("DEL to BOM via CCU", hints, has_layover)
+    return seen[0]
+
+
+def test_layover_token_limit_never_below_doubled_cap(monkeypatch):
+    assert _token_limit_for(monkeypatch, {}, True) == 800
+    assert _token_limit_for(monkeypatch, {"all_flight_numbers": ["6E 1"]}, True) == 800
+    assert _token_limit_for(monkeypatch, {"all_flight_numbers": ["6E 1", "6E 2", "6E 3"]}, True) == 1150
+    assert _token_limit_for(monkeypatch, {}, False) == 400
+
+
+# ---------- FlightParser._iter_llm_list ----------
+def _streamed(monkeypatch, content, size=7):
+    from query_parser import FlightParser
+    parser = FlightParser(cache_enabled=False)
+    deltas = [content[i:i + size] for i in range(0, len(content), size)]
+    monkeypatch.setattr(parser, "_stream_llm_content", lambda prompt, text, max_tokens=0: iter(deltas))
+    return list(parser._iter_llm_list("prompt", "text"))
+
+
+def test_stream_yields_bare_array(monkeypatch):
+    content = '[{"airline": "IndiGo", "segments": [{"a": 1}]}, {"airline": "Vistara"}]'
+    assert [f["airline"] for f in _streamed(monkeypatch, content)] == ["IndiGo", "Vistara"]
+
+
+def test_stream_unwraps_wrapped_response(monkeypatch):
+    content = '{"flights": [{"airline": "IndiGo"}, {"airline": "Vistara"}]}'
+    assert [f["airline"] for f in _streamed(monkeypatch, content)] == ["IndiGo", "Vistara"]
+
+
+def test_stream_recovers_truncated_response(monkeypatch):
+    content = '[{"airline": "IndiGo"}, {"airline": "Vistara"}, {"airline": "Air Ind'
+    assert [f["airline"] for f in _streamed(monkeypatch, content)] == ["IndiGo", "Vistara"]
+
+
+
+# ---------- DurationCalculator ----------
+def test_calculate_returns_na_on_malformed_arguments():
+    from query_parser import DurationCalculator
+    assert DurationCalculator.calculate("06:00", "08:30", "CCU", "DEL", flight_date="30 Jan") == "N/A"
+    assert DurationCalculator.calculate(["06:00"], "08:30", "CCU", "DEL") == "N/A"
+    assert DurationCalculator.calculate("06:00", "08:30", "CCU", "DEL") == "2h 30m"
+
+
+# ---------- Clock ----------
+def test_today_follows_now(monkeypatch):
+    import query_parser
+    from datetime import datetime
+    bucket = 29_480_399                      # 2026-01-30 23:59 UTC, in minutes
+    monkeypatch.setattr(query_parser.time, "time", lambda: bucket * 60 + 30)
+    monkeypatch.setattr(query_parser, "_now_for_minute",
+                        lambda minute: datetime(2026, 1, 30, 23, 59, 59))
+    query_parser._today_str.cache_clear()
+    try:
+        assert query_parser._today() == "30 Jan 2026 (Friday)"
+        assert query_parser._today() == query_parser._now().strftime("%d %b %Y (%A)")
+    finally:
+        query_parser._today_str.cache_clear()
+
+
+# ---------- FlightPostProcessor travel times ----------
+def test_travel_times_only_from_travel_time_lines():
+    from query_parser import FlightPostProcessor
+    assert FlightPostProcessor._travel_times("Unravel the gravel: 2 hrs 10 min") == ()
+    assert FlightPostProcessor._travel_times("TRAVEL TIME: 2 hrs 10 mins") == (("2", "10"),)
+
+
+# ---------- FlightParser.extract_flights_batch ----------
+def test_batch_preserves_order_and_reuses_cache(monkeypatch):
+    import random
+    import re
+    import threading
+    import time
+    from query_parser import FlightParser
+
+    parser = FlightParser(cache_enabled=True)
+    calls = []
+    lock = threading.Lock()
+
+    def fake_call_llm(prompt, user_msg, max_tokens=0):
+        time.sleep(random.uniform(0, 0.02))   # finish out of submission order
+        number = re.search(r'INPUT TEXT:\n.*?(\d{3})', user_msg, re.S).group(1)
+        with lock:
+            calls.append(number)
+        return {"airline": "IndiGo", "flight_number": f"6E {number}",
+                "departure_airport": "DEL", "arrival_airport": "BOM",
+                "departure_time": "06:00", "arrival_time": "08:10"}
+
+    monkeypatch.setattr(parser, "_call_llm", fake_call_llm)
+    numbers = ["101", "202", "303", "101", "404", "202", "505"]
+    texts = [f"IndiGo flight {n} DEL to BOM 06:00 08:10" for n in numbers]
+
+    results = parser.extract_flights_batch(texts, max_workers=4)
+
+    assert [r["flight_number"] for r in results] == [f"6E {n}" for n in numbers]
+    assert sorted(calls) == sorted(set(numbers))      # duplicates never reach the LLM
+    assert results[0] is not results[3] and results[0]["id"] != results[3]["id"]